@@ -0,0 +1,185 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-end timings on synthetic data (see benchmarks/synthetic.py).
+
+For every size: import the applicants file, allocate rounds 1..N (uploading
+synthetic decisions for the previous round before each), time the
+eligibility query on its own, export the offers report and run COAP searches.
+Results are printed (or written with --out) as JSON.
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000
+    python -m benchmarks.run_benchmarks --sizes 1000000 --skip export --out results.json
+    python -m benchmarks.run_benchmarks --sizes 100000 --skip search --export-workers 4
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_candidates, make_round_decisions, make_seat_matrix, write_frame
+from database import db_manager
+from database.bulk_import import stream_import_candidates
+from engine.reports import export_offers
+from engine.round_data import execute_round, load_eligible_candidates, store_round_decisions
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_ROUNDS = 11
+SEARCH_QUERIES = 50
+STEPS = ("import", "rounds", "export", "search")
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round(time.perf_counter() - start, 4)
+
+
+def _fresh_db(path):
+    db_manager.close_all_connections()
+    for f in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(f):
+            os.remove(f)
+    db_manager.DB_NAME = path
+    db_manager.init_db()
+    return db_manager.get_connection()
+
+
+def _load_seat_matrix(conn, df):
+    conn.executemany(
+        "INSERT OR REPLACE INTO seat_matrix (category, set_seats, seats_allocated, seats_booked) VALUES (?, ?, ?, ?)",
+        [(cat, int(total), int(alloc), int(booked)) for cat, total, alloc, booked in df.itertuples(index=False, name=None)],
+    )
+    conn.commit()
+
+
+def _bench_rounds(conn, candidates, rounds, seed):
+    out = []
+    for round_no in range(1, rounds + 1):
+        entry = {"round": round_no}
+        if round_no > 1:
+            offers = pd.read_sql_query("""
+                SELECT o.COAP, c.App_no
+                FROM offers o JOIN candidates c ON c.COAP = o.COAP
+                WHERE o.round_no = ?
+            """, conn, params=(round_no - 1,))
+            decisions = make_round_decisions(offers, candidates, round_no - 1, seed)
+            _, entry["decisions_s"] = _timed(store_round_decisions, conn, round_no - 1, *decisions)
+            conn.commit()
+
+        _, entry["eligibility_s"] = _timed(load_eligible_candidates, round_no, conn)
+        result, entry["round_s"] = _timed(execute_round, round_no, conn=conn)
+        entry["eligible"] = result.eligible_count
+        entry["offers"] = len(result.offers)
+        out.append(entry)
+    return out
+
+
+def _bench_search(conn, candidates, seed):
+    rng = np.random.default_rng(seed)
+    coaps = candidates["COAP"].to_numpy()[rng.choice(len(candidates), SEARCH_QUERIES)]
+    times, hits = [], 0
+    for coap in coaps:
+        rows, seconds = _timed(db_manager.search_candidates, conn, coap[-5:])
+        times.append(seconds)
+        hits += len(rows)
+    return {
+        "queries": len(times),
+        "mean_s": round(statistics.mean(times), 5),
+        "p50_s": round(statistics.median(times), 5),
+        "p95_s": round(float(np.percentile(times, 95)), 5),
+        "rows": hits,
+    }
+
+
+def bench_size(n, workdir, rounds=DEFAULT_ROUNDS, seed=0, skip=(), export_workers=1):
+    """Run every step for n applicants in workdir; returns one result dict."""
+    res = {"size": n}
+    candidates, res["generate_s"] = _timed(make_candidates, n, seed)
+    conn = _fresh_db(os.path.join(workdir, f"bench_{n}.db"))
+
+    if "import" in skip:
+        res["import_s"] = None
+        db_manager.suspend_search_sync(conn)
+        conn.executemany(
+            f"INSERT INTO candidates ({', '.join(candidates.columns)}) VALUES ({', '.join('?' * len(candidates.columns))})",
+            candidates.astype(object).where(candidates.notna(), None).itertuples(index=False, name=None),
+        )
+        db_manager.rebuild_search_index(conn)
+        conn.commit()
+    else:
+        path = write_frame(candidates, os.path.join(workdir, f"applicants_{n}.csv"))
+        table_columns = db_manager.columns(conn, "candidates")
+        _, res["import_s"] = _timed(stream_import_candidates, path, {}, table_columns, conn=conn)
+
+    _load_seat_matrix(conn, make_seat_matrix(n))
+
+    if "rounds" not in skip:
+        res["rounds"] = _bench_rounds(conn, candidates, rounds, seed)
+        res["rounds_total_s"] = round(sum(r["round_s"] for r in res["rounds"]), 4)
+
+    if "export" not in skip:
+        last = rounds if "rounds" not in skip else 1
+        _, res["export_s"] = _timed(export_offers, last, os.path.join(workdir, f"report_{n}.xlsx"),
+                                    conn=conn, workers=export_workers)
+
+    if "search" not in skip:
+        res["search"] = _bench_search(conn, candidates, seed)
+
+    conn.close()
+    db_manager.close_all_connections()
+    return res
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="MTech Offers Automation benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="applicant counts")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", nargs="*", choices=STEPS, default=[], help="steps to leave out")
+    parser.add_argument("--export-workers", type=int, default=1,
+                        help="processes rendering report sheets in parallel (default 1 = in-process)")
+    parser.add_argument("--workdir", help="where databases and files go (default: a temp dir)")
+    parser.add_argument("--out", help="write the JSON results here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="mtech_bench_")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "rounds": args.rounds,
+        "seed": args.seed,
+        "export_workers": args.export_workers,
+        "results": [],
+    }
+    for n in args.sizes:
+        print(f"benchmarking {n} applicants ...", file=sys.stderr)
+        results["results"].append(bench_size(n, workdir, args.rounds, args.seed, set(args.skip), args.export_workers))
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
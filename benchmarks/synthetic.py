@@ -0,0 +1,128 @@
+# benchmarks/synthetic.py
+"""
+Synthetic admissions data for benchmarks and replays: applicants, a seat
+matrix keyed by engine.allocation.SEAT_CATEGORIES, and the three decision
+files of a round derived from that round's offers.
+
+Everything is drawn from a seeded numpy Generator, so the same (size, seed)
+always gives the same data.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.allocation import PWD_QUOTA_KEY, SEAT_CATEGORIES
+from engine.round_data import DECISION_COLUMNS
+
+# ---- Applicant mix ----
+CATEGORY_SHARES = {"GEN": 0.45, "OBC": 0.30, "SC": 0.15, "ST": 0.10}
+FEMALE_SHARE = 0.22
+PWD_SHARE = 0.04
+EWS_SHARE_OF_GEN = 0.25      # Ews = Yes only counts for GEN applicants
+NO_SCORE_SHARE = 0.02        # no GATE score -> never eligible
+
+# ---- Seat matrix ----
+SEATS_PER_1000 = 40
+SECTION_SHARES = {"GEN": 0.40, "EWS": 0.10, "OBC": 0.27, "SC": 0.15, "ST": 0.08}
+FEMALE_SEAT_SHARE = 0.20
+PWD_SEAT_SHARE = 0.05        # *_PWD keys, and the COMMON_PWD quota
+
+# ---- Decisions ----
+GOA_DECISIONS = {"Accept and Freeze": 0.45, "Retain and Wait": 0.30, "Reject and Wait": 0.25}
+OTHER_DECISIONS = {"Accept and Freeze": 0.5, "Retain and Wait": 0.5}
+CONSOLIDATED_DECISIONS = {"Accept and Freeze": 0.5, "Retain and Wait": 0.5}
+OTHER_SHARE = 0.03           # share of all applicants in the other-institute report
+CONSOLIDATED_SHARE = 0.03    # share of all applicants in the consolidated report
+
+
+def _choice(rng, shares, size):
+    return rng.choice(list(shares), size=size, p=list(shares.values()))
+
+
+def _ids(prefix, start, n, width):
+    return np.char.add(prefix, np.char.zfill(np.arange(start, start + n).astype(str), width))
+
+
+def make_candidates(n, seed=0):
+    """n applicants with the candidates-table columns the app reads."""
+    rng = np.random.default_rng(seed)
+
+    category = _choice(rng, CATEGORY_SHARES, n)
+    ews = np.where((category == "GEN") & (rng.random(n) < EWS_SHARE_OF_GEN), "Yes", "No")
+    gender = np.where(rng.random(n) < FEMALE_SHARE, "Female", "Male")
+    pwd = np.where(rng.random(n) < PWD_SHARE, "Yes", "No")
+
+    score = np.clip(rng.normal(550, 150, n), 100, 1000).round(2)
+    score[rng.random(n) < NO_SCORE_SHARE] = np.nan
+
+    app_no = _ids("CS", 1, n, 7)
+    return pd.DataFrame({
+        "Si_NO": np.arange(1, n + 1),
+        "App_no": app_no,
+        "Email": np.char.add(np.char.lower(app_no), "@example.in"),
+        "Full_Name": np.char.add("Applicant ", np.arange(1, n + 1).astype(str)),
+        "Pwd": pwd,
+        "Ews": ews,
+        "Gender": gender,
+        "Category": category,
+        "COAP": _ids("COAP", 1, n, 7),
+        "MaxGATEScore_3yrs": score,
+        "HSSC_per": rng.uniform(50, 100, n).round(2),
+        "SSC_per": rng.uniform(50, 100, n).round(2),
+    })
+
+
+def make_seat_matrix(n_applicants):
+    """Seat matrix rows (category, set_seats, seats_allocated, seats_booked) for every SEAT_CATEGORIES key."""
+    total = max(1, n_applicants * SEATS_PER_1000 // 1000)
+    rows = []
+    for section, keys in SEAT_CATEGORIES.items():
+        if section == PWD_QUOTA_KEY:
+            rows.append((PWD_QUOTA_KEY, max(1, round(total * PWD_SEAT_SHARE)), 0, 0))
+            continue
+        section_seats = max(1, round(total * SECTION_SHARES[section]))
+        for key in keys:
+            share = FEMALE_SEAT_SHARE if "_Female" in key else 1 - FEMALE_SEAT_SHARE
+            if key.endswith("_PWD"):
+                share *= PWD_SEAT_SHARE
+            rows.append((key, max(1, round(section_seats * share)), 0, 0))
+    return pd.DataFrame(rows, columns=["category", "set_seats", "seats_allocated", "seats_booked"])
+
+
+def make_round_decisions(offers, candidates, round_no, seed=0):
+    """
+    (df_goa, df_other, df_cons) for round_no, with the DECISION_COLUMNS names.
+
+    - offers: the round's offers, with COAP and App_no columns
+    - candidates: all applicants, with COAP and App_no columns
+    """
+    rng = np.random.default_rng([seed, round_no])
+
+    goa_key, goa_dec = DECISION_COLUMNS["goa"]
+    df_goa = pd.DataFrame({
+        goa_key: offers["App_no"].to_numpy(),
+        goa_dec: _choice(rng, GOA_DECISIONS, len(offers)),
+    })
+
+    n_other = int(len(candidates) * OTHER_SHARE)
+    other_key, other_dec = DECISION_COLUMNS["other"]
+    df_other = pd.DataFrame({
+        other_key: candidates["App_no"].to_numpy()[rng.choice(len(candidates), n_other, replace=False)],
+        other_dec: _choice(rng, OTHER_DECISIONS, n_other),
+    })
+
+    n_cons = int(len(candidates) * CONSOLIDATED_SHARE)
+    cons_key, cons_dec = DECISION_COLUMNS["consolidated"]
+    df_cons = pd.DataFrame({
+        cons_key: candidates["COAP"].to_numpy()[rng.choice(len(candidates), n_cons, replace=False)],
+        cons_dec: _choice(rng, CONSOLIDATED_DECISIONS, n_cons),
+    })
+    return df_goa, df_other, df_cons
+
+
+def write_frame(df, path):
+    """Write df as .csv or .xlsx, by extension (what the upload dialogs accept)."""
+    if str(path).lower().endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
@@ -0,0 +1,205 @@
+# cli.py
+"""
+Command line entry point for running allocations without the GUI.
+
+    python cli.py run-round 1
+    python cli.py run-round 3 --db /path/to/mtech_offers.db --dry-run --json
+    python cli.py simulate 3 variants.json --workers 4
+    python cli.py replay season_files/ --json
+    python cli.py correct 2 goa CS25000123 "Reject and Wait"
+    python cli.py export 3 --format csv
+    python cli.py export 3 --workers 4
+    python cli.py status
+
+variants.json maps a variant name to seat changes, e.g.
+    {"more GEN": {"GEN_FandM": 60}, "fewer OBC": {"OBC_FandM": 20}}
+"""
+import argparse
+import json
+import sys
+import time
+
+from database import db_manager
+
+
+def _cmd_run_round(args):
+    from engine.round_data import execute_round
+
+    start = time.perf_counter()
+    result = execute_round(args.round_no, write=not args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    summary = result.summary()
+    summary["seconds"] = round(elapsed, 4)
+    summary["written"] = not args.dry_run and result.eligible_count > 0
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    elif result.eligible_count == 0:
+        print(f"No eligible candidates for Round {args.round_no}.")
+    else:
+        print(f"Round {args.round_no}: {summary['offers']} offers "
+              f"from {summary['eligible']} eligible candidates in {elapsed:.3f}s")
+        for cat, count in sorted(summary["by_category"].items()):
+            print(f"  {cat:<20} {count}")
+    return 0
+
+
+def _cmd_simulate(args):
+    from engine.simulation import simulate
+
+    with open(args.variants) as f:
+        variants = json.load(f)
+
+    start = time.perf_counter()
+    sim = simulate(args.round_no, variants, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = sim.summary()
+    summary["seconds"] = round(elapsed, 4)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    elif sim.eligible_count == 0:
+        print(f"No eligible candidates for Round {args.round_no}.")
+    else:
+        print(f"Round {args.round_no}: {len(sim.variants)} variants over "
+              f"{sim.eligible_count} eligible candidates in {elapsed:.3f}s")
+        for variant in sim.variants:
+            print(f"{variant.name}: {variant.offers} offers")
+            for cat, d in variant.by_category.items():
+                if d["delta"]:
+                    print(f"  {cat:<20} {d['baseline']:>5} -> {d['variant']:<5} ({d['delta']:+d})")
+    return 0
+
+
+def _cmd_replay(args):
+    from engine.replay import replay_season
+
+    def on_round(t):
+        if not args.json:
+            print(f"Round {t.round_no:>2}: {t.offers:>5} offers / {t.eligible} eligible  "
+                  f"(decisions {t.decisions_s:.3f}s, allocation {t.allocate_s:.3f}s)")
+
+    result = replay_season(args.directory, rounds=args.rounds, dry_run=args.dry_run, progress=on_round)
+
+    if args.json:
+        print(json.dumps(result.summary(), indent=2))
+    else:
+        state = "committed" if result.committed else "rolled back (dry run)"
+        print(f"{len(result.rounds)} rounds in {result.total_s:.3f}s, {state}")
+    return 0
+
+
+def _cmd_correct(args):
+    from engine.incremental import correct_decisions
+
+    conn = db_manager.get_connection()
+    try:
+        start = time.perf_counter()
+        result = correct_decisions(conn, args.round_no, [(args.source, args.key, args.decision)])
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+
+    if args.json:
+        summary = result.summary()
+        summary["seconds"] = round(elapsed, 4)
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"Round {args.round_no} decision corrected in {elapsed:.3f}s")
+    for change in result.changed:
+        print(f"  Round {change.round_no}: +{len(change.offers_added)} / -{len(change.offers_removed)} "
+              f"offers, {len(change.offers_changed)} changed")
+    if result.skipped:
+        print(f"  unchanged: rounds {', '.join(map(str, result.skipped))}")
+    return 0
+
+
+def _cmd_export(args):
+    from engine.reports import export_offers
+
+    start = time.perf_counter()
+    path = export_offers(args.round_no, args.out, fmt=args.format, workers=args.workers)
+    print(f"Offers for Round {args.round_no} exported to {path} in {time.perf_counter() - start:.3f}s")
+    return 0
+
+
+def _cmd_status(args):
+    from engine.status import status_summary
+
+    conn = db_manager.get_connection()
+    try:
+        summary = status_summary(conn)
+    finally:
+        conn.close()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    labels = {"Y": "accepted", "N": "rejected", "R": "retained", "E": "accepted elsewhere", "-": "no decision yet"}
+    print(f"{sum(summary.values())} candidates with offers")
+    for code, count in summary.items():
+        print(f"  {labels.get(code, code):<20} {count}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="MTech Offers Automation (headless)")
+    parser.add_argument("--db", default=db_manager.DB_NAME, help="SQLite database file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run-round", help="Allocate seats for a round and store the offers")
+    p.add_argument("round_no", type=int)
+    p.add_argument("--dry-run", action="store_true", help="Allocate but do not write to the offers table")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable summary")
+    p.set_defaults(func=_cmd_run_round)
+
+    p = sub.add_parser("simulate", help="Allocate a round against seat-matrix variants (writes nothing)")
+    p.add_argument("round_no", type=int)
+    p.add_argument("variants", help="JSON file: {name: {seat_key: total}}")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (0 = run in-process)")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable summary")
+    p.set_defaults(func=_cmd_simulate)
+
+    p = sub.add_parser("replay", help="Re-run the whole season from a directory of decision files")
+    p.add_argument("directory", help="per-round files, e.g. round1_goa.xlsx, round1_other.csv, round1_consolidated.xlsx")
+    p.add_argument("--rounds", type=int, default=None, help="rounds to allocate (default: last file round + 1)")
+    p.add_argument("--dry-run", action="store_true", help="Roll everything back at the end")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable summary")
+    p.set_defaults(func=_cmd_replay)
+
+    p = sub.add_parser("correct", help="Correct one decision and update the offers of later rounds")
+    p.add_argument("round_no", type=int, help="round the decision belongs to")
+    p.add_argument("source", choices=db_manager.DECISION_SOURCES)
+    p.add_argument("key", help="mtech_app_no (goa/other) or coap_reg_id (consolidated)")
+    p.add_argument("decision", nargs="?", default=None, help="new decision; omit to remove the row")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable summary")
+    p.set_defaults(func=_cmd_correct)
+
+    p = sub.add_parser("export", help="Write the offers report of a round")
+    p.add_argument("round_no", type=int)
+    p.add_argument("--format", choices=("xlsx", "csv", "parquet"), default="xlsx",
+                   help="xlsx workbook, or a folder with one csv/parquet file per sheet")
+    p.add_argument("--out", default=None, help="output file (xlsx) or folder (csv/parquet)")
+    p.add_argument("--workers", type=int, default=1, help="processes rendering sheets in parallel (default 1 = in-process)")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("status", help="Offer/decision status counts over the whole pool")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable summary")
+    p.set_defaults(func=_cmd_status)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db_manager.DB_NAME = args.db
+    # create missing tables and migrate old per-round decision tables, as the GUI does at startup
+    db_manager.init_db()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# database/bulk_import.py
+"""
+Bulk applicant import: one vectorized coercion pass per chunk, then
+chunked executemany calls inside a single transaction. Files are streamed
+through database.sheet_reader, so only one chunk is in memory at a time.
+"""
+import datetime
+
+import pandas as pd
+
+from database import db_manager
+from database.sheet_reader import DEFAULT_CHUNK_SIZE, estimate_rows, iter_chunks, read_preview
+
+# On top of the pool's connection pragmas (WAL, synchronous=NORMAL, ...).
+# Set for the import only: the pooled connection gets its old values back.
+IMPORT_PRAGMAS = {
+    "cache_size": -65536,      # 64 MB
+}
+
+
+def _format_date(v):
+    if isinstance(v, (pd.Timestamp, datetime.date)):
+        return v.strftime('%Y-%m-%d')
+    return v
+
+
+def coerce_df_for_sql(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert DataFrame values to SQLite-safe Python types, column by column:
+    - datetime64 columns -> YYYY-MM-DD strings (vectorized)
+    - numeric/bool columns -> python native types via astype(object)
+    - object columns holding dates (mixed Excel cells) -> YYYY-MM-DD strings
+    - NaN/NaT -> None
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            s = s.dt.strftime('%Y-%m-%d')
+        elif s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in ("datetime", "date", "mixed"):
+            s = s.map(_format_date)
+        s = s.astype(object)
+        out[col] = s.where(s.notna(), None)
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+
+def _insert_chunks(conn, chunks, insert_cols, total=None, progress=None):
+    """
+    Coerce and INSERT OR IGNORE each DataFrame chunk into candidates, all in one
+    transaction. progress(rows_done, total) is called after every chunk.
+    """
+    placeholders = ', '.join(['?'] * len(insert_cols))
+    cols_sql = ', '.join([f'"{c}"' for c in insert_cols])   # quoted columns
+    sql = f'INSERT OR IGNORE INTO candidates ({cols_sql}) VALUES ({placeholders})'
+
+    done = 0
+    cur = conn.cursor()
+    saved = {name: cur.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    try:
+        for name, value in IMPORT_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        # opens the transaction (if none is open); it stays open until commit()
+        db_manager.suspend_search_sync(conn)
+        for chunk in chunks:
+            rows = list(coerce_df_for_sql(chunk[insert_cols]).itertuples(index=False, name=None))
+            cur.executemany(sql, rows)
+            done += len(rows)
+            if progress is not None:
+                progress(done, total)
+        db_manager.rebuild_search_index(conn)
+        db_manager.clear_report_cache(conn)
+        db_manager.ensure_indexes(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in saved.items():
+            cur.execute(f"PRAGMA {name}={value}")
+    return done
+
+
+def bulk_insert_candidates(df, insert_cols, conn=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    INSERT OR IGNORE the insert_cols of an in-memory df into candidates.
+    Returns the number of rows sent to SQLite.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        chunks = (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+        return _insert_chunks(conn, chunks, insert_cols, total=len(df), progress=progress)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def stream_import_candidates(path, rename_map, table_columns, conn=None,
+                             chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Stream an applicants file into candidates chunk by chunk.
+
+    - rename_map: {source column: candidates column} from the mapping dialog
+    - source columns that already carry a candidates column name are kept too
+    Returns the number of rows sent to SQLite, or None if no column maps.
+    """
+    header = list(read_preview(path, nrows=1).columns)
+
+    usecols, insert_cols = [], []
+    for src in header:
+        tgt = rename_map.get(src, src)
+        if tgt in table_columns and tgt not in insert_cols:
+            usecols.append(src)
+            insert_cols.append(tgt)
+    if not insert_cols:
+        return None
+
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        chunks = (
+            chunk[usecols].set_axis(insert_cols, axis=1)
+            for chunk in iter_chunks(path, chunk_size, usecols=usecols)
+        )
+        return _insert_chunks(conn, chunks, insert_cols, total=estimate_rows(path), progress=progress)
+    finally:
+        if own_conn:
+            conn.close()
@@ -1,13 +1,178 @@
 import sqlite3
 import os
 import datetime
+import threading
 
 DB_NAME = "mtech_offers.db"
 
-def get_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+# ---- Connection pool ----
+# One connection per (thread, database file), opened on first use and kept
+# for the life of the thread. Pragmas are applied once, when it is opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16384",      # 16 MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool = []              # every pooled connection, so reset can close them all
+_pool_generation = 0    # bumped by close_all_connections()
+_resolved_paths = {}
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection whose close() hands it back to the pool; the handle
+    stays open.
+
+    Every caller on a thread gets the same connection, so close() must not
+    undo work of a caller further up the stack. get_connection() records
+    whether a transaction was already open when the handle was taken, and
+    close() (handles are closed innermost first) rolls back only a transaction
+    that was opened after its matching get_connection(), as a real close would.
+    """
+    db_path = None      # resolved file path, set by get_connection()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._open_at_acquire = []      # in_transaction at each unclosed get_connection()
+
+    def acquire(self):
+        self._open_at_acquire.append(self.in_transaction)
+        return self
+
+    def close(self):
+        was_open = self._open_at_acquire.pop() if self._open_at_acquire else False
+        if self.in_transaction and not was_open:
+            self.rollback()
+
+    def rollback(self):
+        super().rollback()
+        # the transaction may have created or dropped tables
+        invalidate_schema(self)
+
+    def close_for_real(self):
+        super().close()
+
+
+def resolve_db_path(db_path=None):
+    """Absolute path of db_path (default DB_NAME), resolved once per name."""
+    name = str(db_path or DB_NAME)
+    path = _resolved_paths.get(name)
+    if path is None:
+        path = _resolved_paths[name] = os.path.abspath(name)
+    return path
+
+
+def get_connection(db_path=None):
+    """Pooled connection for the calling thread (sqlite3.Row rows)."""
+    path = resolve_db_path(db_path)
+    if getattr(_local, "generation", None) != _pool_generation:
+        _local.generation = _pool_generation
+        _local.connections = {}
+
+    conn = _local.connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(
+            path,
+            factory=PooledConnection,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,    # only so close_all_connections() can run from any thread
+        )
+        conn.row_factory = sqlite3.Row
+        conn.db_path = path
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.connections[path] = conn
+        with _pool_lock:
+            _pool.append(conn)
+    return conn.acquire()
+
+
+def close_all_connections():
+    """Really close every pooled connection (all threads), e.g. before deleting the DB file."""
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+        for conn in _pool:
+            try:
+                conn.close_for_real()
+            except sqlite3.Error:
+                pass
+        _pool.clear()
+    invalidate_schema()
+
+
+def close_thread_connections():
+    """
+    Really close the calling thread's pooled connections. Workers call this at
+    the end of run(): Qt pool threads expire when idle and new ones take their
+    place, so a connection left open would stay in _pool (file handles, WAL
+    reader) for the life of the app.
+    """
+    if getattr(_local, "generation", None) != _pool_generation:
+        return      # already closed by close_all_connections()
+    conns, _local.connections = list(_local.connections.values()), {}
+    with _pool_lock:
+        for conn in conns:
+            if conn in _pool:
+                _pool.remove(conn)
+            try:
+                conn.close_for_real()
+            except sqlite3.Error:
+                pass
+
+
+# ---- Schema registry ----
+# {db path: {table: [column, ...]}}, read from the catalog on first use and
+# dropped whenever the app changes the schema itself: the create_* helpers,
+# migrations, the search index, reset, and any rollback (which may undo DDL).
+# DDL from another process is not seen until the next invalidation.
+_schema = {}
+_schema_lock = threading.Lock()
+
+def _schema_key(conn):
+    path = getattr(conn, "db_path", None)
+    if path is None:
+        path = conn.execute("PRAGMA database_list").fetchone()[2]   # '' for in-memory
+    return path
+
+def _read_schema(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    names = [row[0] for row in cur.fetchall()]
+    return {name: [row[1] for row in cur.execute(f'PRAGMA table_info("{name}")').fetchall()] for name in names}
+
+def schema(conn):
+    """{table: [columns]} of conn's database (cached, see above)."""
+    key = _schema_key(conn)
+    with _schema_lock:
+        tables = _schema.get(key)
+    if tables is None:
+        tables = _read_schema(conn)
+        if key:     # in-memory databases are not shared, so not cached
+            with _schema_lock:
+                _schema[key] = tables
+    return tables
+
+def has_table(conn, name):
+    return name in schema(conn)
+
+def columns(conn, table):
+    """Column names of table, [] if it does not exist."""
+    return list(schema(conn).get(table, ()))
+
+def invalidate_schema(conn=None):
+    """Forget the cached schema of conn's database (of every database if conn is None)."""
+    with _schema_lock:
+        if conn is None:
+            _schema.clear()
+        else:
+            _schema.pop(_schema_key(conn), None)
 
 def generate_gate_year_columns():
     """
@@ -81,14 +246,17 @@ def init_db():
         GATE_Roll_num TEXT
     )
     """)
+    invalidate_schema(conn)
+
     # ---- Add branch column (if not exists) ----
-    try:
+    if "branch" not in columns(conn, "candidates"):
         cur.execute("ALTER TABLE candidates ADD COLUMN branch TEXT")
-    except:
-        pass
+        invalidate_schema(conn)
     
     # Auto-fill branch based on App_no prefix
     cur.execute("UPDATE candidates SET branch = substr(App_no, 1, 2) WHERE branch IS NULL OR branch = ''")
+    if cur.rowcount > 0:
+        clear_report_cache(conn)
 
     # ---- Seat matrix ----
     cur.execute("""
@@ -101,8 +269,196 @@ def init_db():
         PRIMARY KEY (category, branch)
     )
     """)
+    invalidate_schema(conn)
+
+    # ---- Offers (one row per candidate per round) ----
+    create_offers_table(cur)
+
+    # ---- Decisions (all rounds, all three decision files) ----
+    create_decisions_table(cur)
+    migrate_round_tables(conn)
+
+    # ---- Per-round report snapshots (engine/snapshot.py) ----
+    create_snapshot_tables(cur)
+
+    # ---- Substring search index over candidates ----
+    ensure_search_index(conn)
+
+    ensure_indexes(conn)
     conn.commit()
     conn.close()
+
+def create_offers_table(cursor):
+    if has_table(cursor.connection, "offers"):
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS offers (
+            round_no INTEGER,
+            COAP TEXT,
+            Full_Name TEXT,
+            category TEXT,
+            MaxGATEScore_3yrs REAL,
+            offer_status TEXT,
+            PRIMARY KEY (round_no, COAP)
+        )
+    """)
+    invalidate_schema(cursor.connection)
+
+def create_snapshot_tables(cursor):
+    # filled by engine.snapshot (report_cache through engine.reports)
+    conn = cursor.connection
+    if (has_table(conn, "round_snapshot") and has_table(conn, "snapshot_rounds")
+            and "sheets" in columns(conn, "report_cache")):
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS round_snapshot (
+            round_no INTEGER NOT NULL,
+            COAP TEXT NOT NULL,
+            offered TEXT,
+            accepted TEXT,
+            offerCat TEXT,
+            PRIMARY KEY (round_no, COAP)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot_rounds (
+            round_no INTEGER PRIMARY KEY,
+            created_at TEXT
+        )
+    """)
+    if has_table(conn, "report_cache") and "sheets" not in columns(conn, "report_cache"):
+        # only a cache: one in an older layout is dropped and refilled by exports
+        cursor.execute("DROP TABLE report_cache")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS report_cache (
+            round_no INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL,
+            created_at TEXT,
+            sheets TEXT NOT NULL,       -- JSON: [[sheet name, row positions or null, columns], ...]
+            ranked BLOB NOT NULL,       -- Parquet: the ranked master frame
+            offer_24 BLOB               -- Parquet: the Offer-24-format frame, NULL if nothing was offered
+        )
+    """)
+    invalidate_schema(conn)
+
+def clear_report_cache(conn):
+    """Drop the stored offers report of every round (candidate rows changed). Does not commit."""
+    if has_table(conn, "report_cache"):
+        conn.execute("DELETE FROM report_cache")
+
+def create_status_table(cursor):
+    # filled by engine.status.refresh_candidate_status()
+    if has_table(cursor.connection, "candidate_status"):
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_status (
+            COAP TEXT PRIMARY KEY,
+            App_no TEXT,
+            Offered TEXT,
+            Accepted TEXT,
+            OfferCat TEXT,
+            isOfferPwd TEXT,
+            OfferedRound INTEGER,
+            RetainRound INTEGER,
+            RejectOrAcceptRound INTEGER
+        )
+    """)
+    invalidate_schema(cursor.connection)
+
+# ---- Decisions ----
+# One row per (round, decision file, applicant):
+#   source 'goa'          key = mtech_app_no  (IIT Goa candidate decision report)
+#   source 'other'        key = mtech_app_no  (other IIT freeze/accept report)
+#   source 'consolidated' key = coap_reg_id   (consolidated all-institutes report)
+DECISION_SOURCES = ("goa", "other", "consolidated")
+
+# Pre-decisions schema: one table per source per round -> (prefix, key column, decision column)
+LEGACY_ROUND_TABLES = {
+    "goa": ("iit_goa_offers_round", "mtech_app_no", "applicant_decision"),
+    "other": ("accepted_other_institute_round", "mtech_app_no", "other_institute_decision"),
+    "consolidated": ("consolidated_decisions_round", "coap_reg_id", "applicant_decision"),
+}
+
+def create_decisions_table(cursor):
+    if has_table(cursor.connection, "decisions"):
+        return
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS decisions (
+            round_no INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            key TEXT NOT NULL,
+            decision TEXT,
+            PRIMARY KEY (round_no, source, key)
+        )
+    """)
+    invalidate_schema(cursor.connection)
+
+# Key of a migrated decision as text, normalized like engine.round_data._key_text():
+# application numbers read from Excel as 12345.0 become '12345'
+LEGACY_KEY_TEXT_SQL = """
+    CASE WHEN typeof({col}) = 'real' AND {col} = CAST({col} AS INTEGER)
+         THEN CAST(CAST({col} AS INTEGER) AS TEXT)
+         ELSE CAST({col} AS TEXT) END
+"""
+
+def migrate_round_tables(conn):
+    """
+    Move rows of the old per-round tables (iit_goa_offers_roundN,
+    accepted_other_institute_roundN, consolidated_decisions_roundN) into
+    decisions and drop those tables. Does not commit.
+    """
+    cur = conn.cursor()
+    tables = list(schema(conn))
+    dropped = False
+
+    for source, (prefix, key_col, decision_col) in LEGACY_ROUND_TABLES.items():
+        for table in tables:
+            suffix = table[len(prefix):]
+            if not (table.startswith(prefix) and suffix.isdigit()):
+                continue
+            cols = columns(conn, table)
+            # some early uploads used 'Status' for the decision column
+            dec = decision_col if decision_col in cols else ("Status" if "Status" in cols else None)
+            if key_col in cols and dec:
+                key_sql = LEGACY_KEY_TEXT_SQL.format(col=key_col)
+                cur.execute(f"""
+                    INSERT OR REPLACE INTO decisions (round_no, source, key, decision)
+                    SELECT ?, ?, {key_sql}, {dec}
+                    FROM {table}
+                    WHERE {key_col} IS NOT NULL
+                """, (int(suffix), source))
+            cur.execute(f"DROP TABLE {table}")
+            dropped = True
+    if dropped:
+        invalidate_schema(conn)
+
+# ---- Managed index set ----
+# (index name, table, column list) for the fixed tables
+INDEXES = [
+    ("idx_candidates_coap", "candidates", "COAP"),
+    ("idx_candidates_rank", "candidates", "MaxGATEScore_3yrs DESC, HSSC_per DESC, SSC_per DESC"),
+    ("idx_offers_coap_round", "offers", "COAP, round_no"),
+    # "who froze/rejected in rounds 1..N" scans
+    ("idx_decisions_source_decision", "decisions", "source, decision, round_no"),
+    # per-applicant lookups (detail dialog, upgrades)
+    ("idx_decisions_key", "decisions", "key, source, round_no"),
+    # whole-pool status reports ("everyone who retained in round N")
+    ("idx_candidate_status_accepted", "candidate_status", "Accepted, OfferedRound"),
+]
+
+def ensure_indexes(conn, analyze=True):
+    """
+    Create every managed index whose table exists, then refresh the planner
+    statistics with ANALYZE.
+    Does not commit.
+    """
+    cur = conn.cursor()
+    for name, table, cols in INDEXES:
+        if has_table(conn, table):
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+
+    if analyze:
+        cur.execute("ANALYZE")
     
 def ensure_db():
     if not os.path.exists(DB_NAME):
@@ -115,31 +471,195 @@ def fetch_all_candidates():
     rows = cursor.fetchall()
     conn.close()
     return rows
+
+# ---- Candidate search ----
+# FTS5 trigram index over the searchable columns. External content (the text
+# is not stored twice), kept in step with candidates by AFTER INSERT/UPDATE/
+# DELETE triggers. Bulk imports drop the triggers and rebuild the index in
+# their own transaction instead (suspend_search_sync / rebuild_search_index),
+# which is several times cheaper than per-row sync.
+SEARCH_COLUMNS = ("COAP", "App_no", "Email", "Full_Name")
+SEARCH_MIN_CHARS = 3    # trigram queries need at least one full trigram
+SEARCH_COUNT_CAP = 10000    # match counts stop here ("10000+")
+SEARCH_TOKENIZER = "trigram"    # needs SQLite 3.34+
+
+SEARCH_RESULT_SQL = """
+    SELECT
+        c.COAP AS coap_id,
+        c.App_no AS application_number,
+        c.Category AS category,
+        c.Gender AS gender,
+        c.MaxGATEScore_3yrs AS max_gate_score,
+        c.Pwd AS pwd,
+        c.Ews AS ews
+"""
+
+SEARCH_TRIGGERS = ("candidates_search_ai", "candidates_search_ad", "candidates_search_au")
+
+def _create_search_triggers(conn):
+    cols = ", ".join(SEARCH_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+    delete_old = f"""
+        INSERT INTO candidates_search (candidates_search, rowid, {cols})
+        VALUES ('delete', old.rowid, {old_cols});"""
+    insert_new = f"""
+        INSERT INTO candidates_search (rowid, {cols}) VALUES (new.rowid, {new_cols});"""
+    cur = conn.cursor()
+    cur.execute(f"CREATE TRIGGER IF NOT EXISTS candidates_search_ai AFTER INSERT ON candidates BEGIN {insert_new} END")
+    cur.execute(f"CREATE TRIGGER IF NOT EXISTS candidates_search_ad AFTER DELETE ON candidates BEGIN {delete_old} END")
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_search_au AFTER UPDATE OF {cols} ON candidates
+        BEGIN {delete_old} {insert_new} END
+    """)
+
+def _search_index_stale(conn):
+    """
+    True if candidates_search no longer lines up with candidates. The triggers
+    keep it in step with every write, but VACUUM renumbers the implicit rowids
+    of candidates (App_no is a TEXT key), which shows up here as a different
+    highest rowid or row count.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*), MAX(rowid) FROM candidates")
+    table = cur.fetchone()
+    cur.execute("SELECT COUNT(*), MAX(id) FROM candidates_search_docsize")
+    return tuple(table) != tuple(cur.fetchone())
+
+def ensure_search_index(conn):
+    """
+    Create the candidates_search FTS5 table and its sync triggers if missing,
+    and (re)fill it from candidates when it is new or out of step with them.
+    Leaves the database without an index when this SQLite cannot create it.
+    Does not commit.
+    """
+    cur = conn.cursor()
+    if not has_table(conn, "candidates_search"):
+        try:
+            cur.execute(f"""
+                CREATE VIRTUAL TABLE candidates_search USING fts5(
+                    {", ".join(SEARCH_COLUMNS)}, content='candidates', content_rowid='rowid',
+                    tokenize='{SEARCH_TOKENIZER}'
+                )
+            """)
+        except sqlite3.OperationalError:
+            # SQLite older than 3.34 (no trigram tokenizer) or built without FTS5:
+            # no index, search_candidates() falls back to LIKE
+            return
+        invalidate_schema(conn)
+        stale = True
+    else:
+        stale = _search_index_stale(conn)
+
+    placeholders = ", ".join("?" * len(SEARCH_TRIGGERS))
+    cur.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})", SEARCH_TRIGGERS)
+    if cur.fetchone()[0] < len(SEARCH_TRIGGERS):
+        # writes made before the triggers existed were never indexed
+        _create_search_triggers(conn)
+        stale = True
+
+    if stale:
+        cur.execute("INSERT INTO candidates_search (candidates_search) VALUES ('rebuild')")
+
+def suspend_search_sync(conn):
+    """
+    Drop the candidates_search triggers before a bulk load into candidates.
+    The same transaction must end with rebuild_search_index(), which puts
+    them back; one is opened here if none is, so a rollback restores them.
+    Does not commit.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")       # sqlite3 does not open one before DDL
+    for name in SEARCH_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def rebuild_search_index(conn):
+    """Re-index candidates_search (after a bulk load) and restore its triggers. Does not commit."""
+    if not has_table(conn, "candidates_search"):
+        ensure_search_index(conn)
+        return
+    conn.execute("INSERT INTO candidates_search (candidates_search) VALUES ('rebuild')")
+    _create_search_triggers(conn)
+
+def _search_filter(conn, text):
+    """(FROM/WHERE clause, params) selecting the candidates c that match text."""
+    if len(text) >= SEARCH_MIN_CHARS and has_table(conn, "candidates_search"):
+        phrase = '"' + text.replace('"', '""') + '"'
+        return """
+            FROM candidates_search s
+            JOIN candidates c ON c.rowid = s.rowid
+            WHERE candidates_search MATCH ? AND c.COAP IS NOT NULL
+        """, [phrase]
+
+    pattern = f"%{text}%"
+    where = " OR ".join(f"c.{col} LIKE ?" for col in SEARCH_COLUMNS)
+    return f"""
+        FROM candidates c
+        WHERE c.COAP IS NOT NULL AND ({where})
+    """, [pattern] * len(SEARCH_COLUMNS)
+
+def search_candidates(conn, text, limit=50, after=None):
+    """
+    Candidates whose COAP, App_no, Email or Full_Name contains text
+    (case-insensitive), as Search page rows ordered by COAP, with their
+    offered/accepted status when candidate_status exists.
+
+    Text of SEARCH_MIN_CHARS or more goes through the trigram index (created
+    by init_db); shorter text, or a database without the index, walks
+    candidates in COAP order and stops at the limit.
+
+    Pages are keyset-based: pass after=(coap_id, row_key) of the last row
+    already shown to get the next page (row_key is the candidate's rowid,
+    the tie-break for equal COAPs).
+    """
+    filter_sql, params = _search_filter(conn, text)
+    if after is not None:
+        filter_sql += " AND (c.COAP, c.rowid) > (?, ?)"
+        params = params + list(after)
+    page_sql = SEARCH_RESULT_SQL + """,
+            c.rowid AS row_key
+    """ + filter_sql + """
+        ORDER BY c.COAP, c.rowid
+        LIMIT ?
+    """
+
+    if has_table(conn, "candidate_status"):
+        # offer / decision status of the page's rows (engine/status.py keeps the table)
+        page_sql = f"""
+            SELECT p.*, st.Offered AS offered, st.Accepted AS accepted, st.OfferedRound AS offered_round
+            FROM ({page_sql}) p
+            LEFT JOIN candidate_status st ON st.COAP = p.coap_id
+            ORDER BY p.coap_id, p.row_key
+        """
+    cur = conn.execute(page_sql, (*params, limit))
+    return cur.fetchall()
+
+def count_search_matches(conn, text, cap=SEARCH_COUNT_CAP):
+    """
+    Number of candidates search_candidates() would return for text, counted
+    up to cap: a result of cap means "cap or more".
+    """
+    filter_sql, params = _search_filter(conn, text)
+    cur = conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 {filter_sql} LIMIT ?)", (*params, cap))
+    return cur.fetchone()[0]
+
 def reset_db_data():
     """
     Deletes the database file completely and then re-initializes empty tables.
     This effectively performs a full application reset.
     """
-    conn = None
-    try:
-        # Step 1: Close any open connections (if any are held, though typically they shouldn't be)
-        # In a real app, this is crucial. Since PySide6 manages the main thread,
-        # we assume connections are short-lived, but it's good practice.
-        pass 
-    except Exception:
-        pass
+    # Step 1: Close the pooled connections of every thread
+    close_all_connections()
 
-    # Step 2: Delete the database file
-    if os.path.exists(DB_NAME):
-        os.remove(DB_NAME)
+    # Step 2: Delete the database file (and its WAL side files)
+    path = resolve_db_path()
+    for f in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(f):
+            os.remove(f)
 
-    # Step 3: Re-initialize the tables
+    # Step 3: Re-initialize the tables (init_db creates all of them, offers and decisions included)
     init_db()
 
-    # NOTE: Since offers and decisions tables are not defined in init_db, 
-    # they are missing here. You should ensure init_db creates ALL required tables.
-    # I will assume init_db has been updated to include ALL tables (offers, decisions, etc.).
-
     return True
 
 def insert_candidate(data_dict):
@@ -151,6 +671,8 @@ def insert_candidate(data_dict):
         f'INSERT OR IGNORE INTO candidates ({columns}) VALUES ({placeholders})',
         tuple(data_dict.values())
     )
+    if cursor.rowcount == 1:
+        clear_report_cache(conn)
     conn.commit()
     conn.close()
 
@@ -163,6 +685,9 @@ def insert_many_candidates(list_of_dicts):
     columns = ', '.join(keys)
     placeholders = ', '.join(['?'] * len(keys))
     rows = [tuple(d[k] for k in keys) for d in list_of_dicts]
+    suspend_search_sync(conn)
     cur.executemany(f'INSERT OR IGNORE INTO candidates ({columns}) VALUES ({placeholders})', rows)
+    rebuild_search_index(conn)
+    clear_report_cache(conn)
     conn.commit()
     conn.close()
\ No newline at end of file
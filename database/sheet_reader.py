@@ -0,0 +1,112 @@
+# database/sheet_reader.py
+"""
+Chunked readers for applicant / decision / seat matrix files.
+
+.xlsx/.xlsm are streamed with openpyxl in read-only mode and .csv with
+pandas' chunked reader, so memory stays at roughly one chunk whatever the
+file size. Legacy .xls has no streaming reader and is loaded with
+pd.read_excel, then sliced into chunks.
+"""
+import os
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 5000
+PREVIEW_ROWS = 200
+
+# File dialog filter used by every upload button
+FILE_FILTER = "Excel / CSV Files (*.xlsx *.xlsm *.xls *.csv)"
+
+
+def _ext(path):
+    return os.path.splitext(str(path))[1].lower()
+
+
+def _make_header(raw):
+    """Column labels like pd.read_excel: blanks -> 'Unnamed: i', duplicates -> 'X.1'."""
+    header, seen = [], {}
+    for i, v in enumerate(raw):
+        name = f"Unnamed: {i}" if v is None or (isinstance(v, str) and not v.strip()) else v
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+
+def _iter_xlsx(path, chunk_size, usecols):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = _make_header(next(rows, ()))
+        idx = [i for i, h in enumerate(header) if usecols is None or h in usecols]
+        cols = [header[i] for i in idx]
+
+        buf, yielded = [], False
+        for row in rows:
+            if row is None or all(v is None for v in row):
+                continue
+            buf.append(tuple(row[i] if i < len(row) else None for i in idx))
+            if len(buf) >= chunk_size:
+                yield pd.DataFrame(buf, columns=cols)
+                buf, yielded = [], True
+        if buf or not yielded:
+            yield pd.DataFrame(buf, columns=cols)
+    finally:
+        wb.close()
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, usecols=None):
+    """
+    Yield DataFrames of at most chunk_size rows from the first sheet of path.
+    usecols (list of header labels) limits which columns are materialized.
+    An empty file still yields one empty DataFrame carrying the header.
+    """
+    ext = _ext(path)
+    if ext == ".csv":
+        yielded = False
+        for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=usecols):
+            yielded = True
+            yield chunk
+        if not yielded:
+            yield pd.read_csv(path, nrows=0, usecols=usecols)
+    elif ext in (".xlsx", ".xlsm"):
+        yield from _iter_xlsx(path, chunk_size, usecols)
+    else:
+        df = pd.read_excel(path, usecols=usecols)
+        if df.empty:
+            yield df
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def read_preview(path, nrows=PREVIEW_ROWS):
+    """Header plus the first nrows rows, for column-mapping dialogs."""
+    chunks = iter_chunks(path, chunk_size=nrows)
+    try:
+        return next(chunks)
+    finally:
+        chunks.close()
+
+
+def read_frame(path, usecols=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Whole file as one DataFrame, materializing only usecols."""
+    return pd.concat(list(iter_chunks(path, chunk_size, usecols)), ignore_index=True)
+
+
+def estimate_rows(path):
+    """Best-effort data row count (None when it would need a full scan)."""
+    if _ext(path) not in (".xlsx", ".xlsm"):
+        return None
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        max_row = wb.active.max_row
+    finally:
+        wb.close()
+    return max(max_row - 1, 0) if max_row else None
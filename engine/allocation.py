@@ -0,0 +1,318 @@
+# engine/allocation.py
+"""
+Pure-Python seat allocation for a single COAP round.
+
+Nothing in here touches SQLite or Qt: callers hand in the ranked candidates,
+the seat matrix and the upgraded map, and get the offers back as an
+AllocationResult. ui/round_worker.RoundWorker and cli.py are thin wrappers
+around allocate().
+"""
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+# Column order expected for every candidate row passed to allocate()
+CANDIDATE_COLUMNS = (
+    "COAP", "App_no", "Full_Name", "Category", "Ews", "Gender", "Pwd", "MaxGATEScore_3yrs"
+)
+
+PWD_QUOTA_KEY = "COMMON_PWD"
+
+# Seat matrix keys, grouped by the sections of the Seat Matrix tab
+SEAT_CATEGORIES = {
+    "COMMON_PWD": ["COMMON_PWD"],
+    "EWS": ["EWS_FandM", "EWS_FandM_PWD", "EWS_Female", "EWS_Female_PWD"],
+    "GEN": ["GEN_FandM", "GEN_FandM_PWD", "GEN_Female", "GEN_Female_PWD"],
+    "OBC": ["OBC_FandM", "OBC_FandM_PWD", "OBC_Female", "OBC_Female_PWD"],
+    "SC": ["SC_FandM", "SC_FandM_PWD", "SC_Female", "SC_Female_PWD"],
+    "ST": ["ST_FandM", "ST_FandM_PWD", "ST_Female", "ST_Female_PWD"],
+}
+
+STATUS_OFFERED = "Offered"
+STATUS_UPGRADED = "Offered (Upgraded)"
+STATUS_PWD = "Offered (PWD Priority)"
+
+# Progress stages reported through the optional progress(stage, percent) callback
+STAGE_ELIGIBLE = "Eligible set built"
+STAGE_SORTED = "Candidates sorted"
+STAGE_PWD = "PWD pass"
+STAGE_MAIN = "Main pass"
+STAGE_WRITTEN = "Offers written"
+
+STAGE_PERCENT = {
+    STAGE_ELIGIBLE: 20,
+    STAGE_SORTED: 40,
+    STAGE_PWD: 60,
+    STAGE_MAIN: 80,
+    STAGE_WRITTEN: 100,
+}
+
+# How often (in candidates) the main loop polls should_cancel()
+CANCEL_CHECK_EVERY = 4096
+
+
+class AllocationCancelled(Exception):
+    """Raised when should_cancel() returns True while a round is being allocated."""
+
+
+@dataclass
+class Offer:
+    round_no: int
+    coap: str
+    full_name: str
+    category: str
+    score: float
+    status: str
+
+    def as_row(self):
+        """Row in the column order of the `offers` table."""
+        return (self.round_no, self.coap, self.full_name, self.category, self.score, self.status)
+
+
+@dataclass
+class AllocationResult:
+    round_no: int
+    eligible_count: int = 0
+    offers: list = field(default_factory=list)
+    seat_matrix: dict = field(default_factory=dict)   # seat key -> {"total", "allocated"} after the round
+    pwd_total: int = 0
+    pwd_allocated: int = 0
+
+    def offer_rows(self):
+        return [o.as_row() for o in self.offers]
+
+    def offers_by_category(self):
+        counts = {}
+        for o in self.offers:
+            counts[o.category] = counts.get(o.category, 0) + 1
+        return counts
+
+    def summary(self):
+        return {
+            "round_no": self.round_no,
+            "eligible": self.eligible_count,
+            "offers": len(self.offers),
+            "pwd_allocated": self.pwd_allocated,
+            "by_category": self.offers_by_category(),
+        }
+
+
+def _flag_yes(values, expected):
+    """Vectorized value.strip().capitalize() == expected ('female ' -> Female); blanks never match."""
+    return (values.fillna("").astype(str).str.strip().str.capitalize() == expected).to_numpy()
+
+
+def _values(series):
+    """Column as a python list, missing values as None (not NaN)."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def report(progress, stage):
+    if progress is not None:
+        progress(stage, STAGE_PERCENT[stage])
+
+
+def check_cancel(should_cancel):
+    if should_cancel is not None and should_cancel():
+        raise AllocationCancelled()
+
+
+# ------------------------------------------------------
+# Candidates, normalized once
+# ------------------------------------------------------
+@dataclass
+class CandidateTable:
+    """
+    Ranked candidates with every attribute allocate() branches on already
+    normalized. Seat-matrix independent, so one table can be allocated
+    against any number of seat matrices.
+
+    group[i] indexes groups, the distinct (base_cat, is_female, is_ews)
+    combinations; seat priorities are resolved once per group.
+    """
+    coaps: list = field(default_factory=list)
+    names: list = field(default_factory=list)
+    scores: list = field(default_factory=list)
+    is_pwd: list = field(default_factory=list)
+    group: list = field(default_factory=list)
+    groups: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.coaps)
+
+
+def prepare_candidates(candidates):
+    """
+    CandidateTable from ranked rows in CANDIDATE_COLUMNS order (or a DataFrame
+    with those columns), normalized column-wise: categories stripped, Gender /
+    Ews / Pwd matched case- and whitespace-insensitively.
+    """
+    if isinstance(candidates, CandidateTable):
+        return candidates
+    if isinstance(candidates, pd.DataFrame):
+        df = candidates
+    else:
+        df = pd.DataFrame(list(candidates), columns=list(CANDIDATE_COLUMNS))
+    if df.empty:
+        return CandidateTable()
+
+    base_cat = df["Category"].fillna("").astype(str).str.strip()
+    female = _flag_yes(df["Gender"], "Female")
+    ews = _flag_yes(df["Ews"], "Yes")
+    codes, groups = pd.factorize(pd.MultiIndex.from_arrays([base_cat, female, ews]))
+
+    return CandidateTable(
+        coaps=_values(df["COAP"]),
+        names=_values(df["Full_Name"]),
+        scores=_values(df["MaxGATEScore_3yrs"]),
+        is_pwd=_flag_yes(df["Pwd"], "Yes").tolist(),
+        group=codes.tolist(),
+        groups=[(cat, bool(f), bool(e)) for cat, f, e in groups],
+    )
+
+
+def _pwd_seat(base_cat, is_female, is_ews, seat_ids):
+    """Seat id of the PWD pass (Female seat first, fall back to FandM); -1 if none."""
+    cat_prefix = "EWS" if is_ews else base_cat
+    key = f"{cat_prefix}_Female"
+    if key not in seat_ids or not is_female:
+        key = f"{cat_prefix}_FandM"
+    return seat_ids.get(key, -1)
+
+
+def _main_priority(base_cat, is_female, is_ews, seat_ids):
+    """Seat ids of the main pass in order: GEN, then the reserved category."""
+    general_keys = ["GEN_FandM"]
+    if is_female:
+        general_keys.insert(0, "GEN_Female")
+
+    # EWS applies ONLY when the base category is GEN
+    reserved_cat = base_cat.upper() if base_cat else "GEN"
+    cat_prefix = "EWS" if reserved_cat == "GEN" and is_ews else base_cat
+
+    reserved_keys = [f"{cat_prefix}_FandM"]
+    if is_female:
+        reserved_keys.insert(0, f"{cat_prefix}_Female")
+
+    # a seat that was full once stays full for this candidate: drop repeats
+    return tuple(dict.fromkeys(seat_ids[k] for k in general_keys + reserved_keys if k in seat_ids))
+
+
+def allocate(round_no, candidates, seat_matrix, upgraded_map=None, progress=None, should_cancel=None):
+    """
+    Run the round allocation (PWD priority pass, then the main pass).
+
+    - candidates: a CandidateTable, or rows in CANDIDATE_COLUMNS order; either
+      way already ranked (MaxGATEScore_3yrs DESC, HSSC_per DESC, SSC_per DESC)
+    - seat_matrix: {seat_key: {"total": int, "allocated": int}}; COMMON_PWD is
+      treated as a quota inside the base category seats, not as extra seats
+    - upgraded_map: {COAP: category offered in the previous round}
+    - progress: optional callable(stage, percent), called after each pass
+    - should_cancel: optional callable polled between passes and inside the
+      main loop; AllocationCancelled is raised when it returns True
+
+    Seats are numbered once and capacities kept in lists indexed by seat id;
+    every candidate walks the precomputed seat-id priority of its group.
+    Candidates whose whole priority list is full are skipped without a
+    seat lookup, and the passes stop as soon as no seat is left.
+    The caller's seat_matrix is not modified.
+    """
+    upgraded_map = upgraded_map or {}
+    table = prepare_candidates(candidates)
+
+    seat_keys = [k for k in seat_matrix if k != PWD_QUOTA_KEY]
+    seat_ids = {k: i for i, k in enumerate(seat_keys)}
+    totals = [seat_matrix[k]["total"] for k in seat_keys]
+    used = [seat_matrix[k]["allocated"] for k in seat_keys]
+
+    pwd_quota_entry = seat_matrix.get(PWD_QUOTA_KEY, {"total": 0, "allocated": 0})
+    pwd_reservation_total = pwd_quota_entry["total"]
+    pwd_reservation_allocated = pwd_quota_entry["allocated"]   # start from confirmed PWD seats
+
+    pwd_seat = [_pwd_seat(*g, seat_ids) for g in table.groups]
+    main_priority = [_main_priority(*g, seat_ids) for g in table.groups]
+
+    # ---- Remaining capacity, for early termination ----
+    # remaining: free seats overall; open_seats[g]: seats of group g's priority
+    # that still have room. Capacity only ever goes down, so a group at 0
+    # stays exhausted for the rest of the round.
+    remaining = sum(max(t - u, 0) for t, u in zip(totals, used))
+    open_seats = [sum(1 for sid in prio if used[sid] < totals[sid]) for prio in main_priority]
+    groups_of_seat = [[] for _ in seat_keys]
+    for g, prio in enumerate(main_priority):
+        for sid in prio:
+            groups_of_seat[sid].append(g)
+
+    def take(sid):
+        nonlocal remaining
+        used[sid] += 1
+        remaining -= 1
+        if used[sid] == totals[sid]:
+            for g in groups_of_seat[sid]:
+                open_seats[g] -= 1
+
+    coaps, names, scores, group = table.coaps, table.names, table.scores, table.group
+    offers_made = []
+    allocated = set()
+
+    # ------------------------------------------------------
+    # PWD pre-allocation (highest scored PWD first) into the BASE category seat
+    # ------------------------------------------------------
+    for i, is_pwd in enumerate(table.is_pwd):
+        if pwd_reservation_allocated >= pwd_reservation_total or remaining <= 0:
+            break
+        if not is_pwd:
+            continue
+        coap = coaps[i]
+        sid = pwd_seat[group[i]]
+        if coap in allocated or sid < 0 or used[sid] >= totals[sid]:
+            continue
+        take(sid)
+        offers_made.append(Offer(round_no, coap, names[i], seat_keys[sid], scores[i], STATUS_PWD))
+        allocated.add(coap)
+        pwd_reservation_allocated += 1
+
+    report(progress, STAGE_PWD)
+    check_cancel(should_cancel)
+
+    # ------------------------------------------------------
+    # Main allocation: GEN -> own category -> retained/upgraded seat
+    # ------------------------------------------------------
+    for i, coap in enumerate(coaps):
+        if remaining <= 0:
+            break       # every seat is taken: nobody further down can get one
+        if i % CANCEL_CHECK_EVERY == 0:
+            check_cancel(should_cancel)
+        if coap in allocated:
+            continue
+
+        g = group[i]
+        priority = main_priority[g]
+        status = STATUS_OFFERED
+        if coap in upgraded_map:
+            status = STATUS_UPGRADED
+            upgraded_sid = seat_ids.get(upgraded_map[coap])
+            if upgraded_sid is not None:
+                priority = priority + (upgraded_sid,)
+        elif open_seats[g] == 0:
+            continue    # whole priority list exhausted
+
+        for sid in priority:
+            if used[sid] < totals[sid]:
+                take(sid)
+                offers_made.append(Offer(round_no, coap, names[i], seat_keys[sid], scores[i], status))
+                allocated.add(coap)
+                break
+
+    report(progress, STAGE_MAIN)
+
+    seats = {k: {"total": totals[i], "allocated": used[i]} for i, k in enumerate(seat_keys)}
+    seats[PWD_QUOTA_KEY] = {"total": pwd_reservation_total, "allocated": pwd_reservation_allocated}
+    return AllocationResult(
+        round_no=round_no,
+        eligible_count=len(table),
+        offers=offers_made,
+        seat_matrix=seats,
+        pwd_total=pwd_reservation_total,
+        pwd_allocated=pwd_reservation_allocated,
+    )
@@ -0,0 +1,148 @@
+# engine/incremental.py
+"""
+Decision corrections without re-running the whole season.
+
+A corrected decision of round k can only change rounds k+1 onwards, and a
+round's offers only change if its inputs do: the eligible set or the
+upgraded map (seat matrix and candidate details are not touched by a
+correction). For every later round those inputs are captured before the
+correction and compared afterwards, in order, so changed offers cascade
+into the next round's upgraded map. Rounds whose inputs are unchanged are
+skipped; the others are re-allocated and only their changed offer rows are
+rewritten. Offers end up exactly as a full re-run of those rounds.
+"""
+from dataclasses import dataclass, field
+
+from database import db_manager
+from engine.allocation import allocate
+from engine.round_data import (
+    _get_eligible_candidates_for_next_round, _get_upgraded_candidates, _key_text,
+    load_round_inputs, save_offers,
+)
+from engine.snapshot import invalidate_snapshots
+from engine.status import refresh_candidate_status
+
+
+@dataclass
+class RoundChange:
+    round_no: int
+    eligible_added: list = field(default_factory=list)
+    eligible_removed: list = field(default_factory=list)
+    upgrade_changed: list = field(default_factory=list)    # COAPs whose upgraded seat changed
+    offers_added: list = field(default_factory=list)
+    offers_removed: list = field(default_factory=list)
+    offers_changed: list = field(default_factory=list)     # same COAP, other category/status
+
+
+@dataclass
+class CorrectionResult:
+    round_no: int                                          # round of the corrected decisions
+    changed: list = field(default_factory=list)            # RoundChange, rounds that were re-allocated
+    skipped: list = field(default_factory=list)            # later rounds whose inputs did not change
+
+    def summary(self):
+        return {
+            "round_no": self.round_no,
+            "recomputed": [vars(c) for c in self.changed],
+            "skipped": self.skipped,
+        }
+
+
+def _round_state(round_no, conn):
+    """(eligible COAP set, upgraded map): everything a correction can change about round_no."""
+    return (
+        set(_get_eligible_candidates_for_next_round(round_no - 1, conn)),
+        _get_upgraded_candidates(round_no - 1, conn),
+    )
+
+
+def _stored_offers(round_no, conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT round_no, COAP, Full_Name, category, MaxGATEScore_3yrs, offer_status
+        FROM offers
+        WHERE round_no = ?
+    """, (round_no,))
+    return {row[1]: tuple(row) for row in cursor.fetchall()}
+
+
+def _apply_corrections(conn, round_no, corrections):
+    cursor = conn.cursor()
+    for source, key, decision in corrections:
+        if source not in db_manager.DECISION_SOURCES:
+            raise ValueError(f"Unknown decision source '{source}'")
+        if decision is None:
+            cursor.execute(
+                "DELETE FROM decisions WHERE round_no = ? AND source = ? AND key = ?",
+                (round_no, source, _key_text(key)),
+            )
+        else:
+            cursor.execute(
+                "INSERT OR REPLACE INTO decisions (round_no, source, key, decision) VALUES (?, ?, ?, ?)",
+                (round_no, source, _key_text(key), decision),
+            )
+    invalidate_snapshots(conn, round_no)
+
+
+def correct_decisions(conn, round_no, corrections, commit=True):
+    """
+    Apply corrections to the decisions of round_no and bring the offers of
+    every later round up to date.
+
+    - corrections: iterable of (source, key, decision); source is 'goa',
+      'other' or 'consolidated', key the application number / COAP as in
+      the uploaded file, decision None removes the row
+    Returns a CorrectionResult. Any error rolls everything back.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(round_no) FROM offers")
+    last_round = cursor.fetchone()[0] or 0
+    later_rounds = range(round_no + 1, last_round + 1)
+
+    result = CorrectionResult(round_no=round_no)
+    try:
+        before = {r: _round_state(r, conn) for r in later_rounds}
+        _apply_corrections(conn, round_no, corrections)
+
+        for r in later_rounds:
+            old_eligible, old_upgraded = before[r]
+            new_eligible, new_upgraded = _round_state(r, conn)
+            if new_eligible == old_eligible and new_upgraded == old_upgraded:
+                result.skipped.append(r)
+                continue
+
+            change = RoundChange(
+                round_no=r,
+                eligible_added=sorted(new_eligible - old_eligible),
+                eligible_removed=sorted(old_eligible - new_eligible),
+                upgrade_changed=sorted(
+                    c for c in set(old_upgraded) | set(new_upgraded)
+                    if old_upgraded.get(c) != new_upgraded.get(c)
+                ),
+            )
+
+            inputs = load_round_inputs(r, conn)
+            allocation = allocate(r, inputs.candidates, inputs.seat_matrix, inputs.upgraded_map)
+            new_offers = {row[1]: row for row in allocation.offer_rows()}
+            old_offers = _stored_offers(r, conn)
+
+            change.offers_added = sorted(set(new_offers) - set(old_offers))
+            change.offers_removed = sorted(set(old_offers) - set(new_offers))
+            change.offers_changed = sorted(
+                c for c in set(new_offers) & set(old_offers) if new_offers[c] != old_offers[c]
+            )
+
+            cursor.executemany(
+                "DELETE FROM offers WHERE round_no = ? AND COAP = ?",
+                [(r, c) for c in change.offers_removed],
+            )
+            save_offers(conn, [new_offers[c] for c in change.offers_added + change.offers_changed])
+            result.changed.append(change)
+
+        refresh_candidate_status(conn)
+        if commit:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return result
@@ -0,0 +1,154 @@
+# engine/replay.py
+"""
+Full-season replay: re-run every round from a directory of decision files,
+in one process and one transaction.
+
+Files are matched by name: a round number ("round3", "Round_3", "round-3")
+plus the source ("goa", "other", "consolidated"/"cons"), any extension the
+upload dialogs accept, e.g.
+
+    round1_goa.xlsx   round1_other.csv   round1_consolidated.xlsx
+    round2_goa.xlsx   ...
+
+Round 1 is allocated first; before round N the round N-1 files are stored,
+exactly as "Generate Offers" does after an upload. A missing file counts as
+an empty decision file.
+"""
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from database import db_manager
+from database.sheet_reader import read_frame
+from engine.round_data import DECISION_COLUMNS, auto_match_columns, execute_round, store_round_decisions
+from engine.snapshot import invalidate_snapshots
+from engine.status import refresh_candidate_status
+
+DECISION_FILE_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv")
+ROUND_RE = re.compile(r"round[\s_-]*(\d+)", re.IGNORECASE)
+# checked in this order: "consolidated" names often mention goa too
+SOURCE_RE = (
+    ("consolidated", re.compile(r"consolidated|cons", re.IGNORECASE)),
+    ("other", re.compile(r"other", re.IGNORECASE)),
+    ("goa", re.compile(r"goa", re.IGNORECASE)),
+)
+
+
+@dataclass
+class RoundTiming:
+    round_no: int
+    decisions_s: float = 0.0      # storing the previous round's files
+    allocate_s: float = 0.0
+    eligible: int = 0
+    offers: int = 0
+
+
+@dataclass
+class ReplayResult:
+    rounds: list = field(default_factory=list)     # RoundTiming per round
+    total_s: float = 0.0
+    committed: bool = False
+
+    def summary(self):
+        return {
+            "rounds": [vars(r) for r in self.rounds],
+            "offers": sum(r.offers for r in self.rounds),
+            "total_s": self.total_s,
+            "committed": self.committed,
+        }
+
+
+def find_decision_files(directory):
+    """{round_no: {source: path}} for the decision files in directory."""
+    found = {}
+    for name in sorted(os.listdir(directory)):
+        if os.path.splitext(name)[1].lower() not in DECISION_FILE_EXTENSIONS:
+            continue
+        round_match = ROUND_RE.search(name)
+        source = next((src for src, pattern in SOURCE_RE if pattern.search(name)), None)
+        if round_match is None or source is None:
+            continue
+        found.setdefault(int(round_match.group(1)), {})[source] = os.path.join(directory, name)
+    return found
+
+
+def load_decision_files(files):
+    """(df_goa, df_other, df_cons) for one round's {source: path}, column-matched."""
+    frames = []
+    for source in ("goa", "other", "consolidated"):
+        required = DECISION_COLUMNS[source]
+        path = files.get(source)
+        if path is None:
+            frames.append(pd.DataFrame(columns=required))
+        else:
+            frames.append(auto_match_columns(read_frame(path), required))
+    return tuple(frames)
+
+
+def replay_season(directory, rounds=None, conn=None, dry_run=False, progress=None):
+    """
+    Replay the season from directory (see the module docstring).
+
+    - rounds: how many rounds to allocate (default: one more than the last
+      round that has decision files)
+    - dry_run: roll everything back at the end instead of committing
+    - progress: optional callable(RoundTiming), called after every round
+
+    Existing offers and decisions are cleared first, inside the same
+    transaction, so the result is the season the files describe. Any error
+    rolls the whole replay back.
+    """
+    files = find_decision_files(directory)
+    if rounds is None:
+        rounds = max(files, default=0) + 1
+
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+
+    result = ReplayResult()
+    start = time.perf_counter()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM offers")
+        cursor.execute("DELETE FROM decisions")
+        invalidate_snapshots(conn, 0)
+
+        for round_no in range(1, rounds + 1):
+            timing = RoundTiming(round_no=round_no)
+
+            if round_no > 1:
+                t = time.perf_counter()
+                decisions = load_decision_files(files.get(round_no - 1, {}))
+                store_round_decisions(conn, round_no - 1, *decisions)
+                timing.decisions_s = round(time.perf_counter() - t, 4)
+
+            t = time.perf_counter()
+            allocation = execute_round(round_no, conn=conn, commit=False)
+            if allocation.eligible_count == 0 and round_no > 1:
+                refresh_candidate_status(conn)      # decisions stored, no round run
+            timing.allocate_s = round(time.perf_counter() - t, 4)
+            timing.eligible = allocation.eligible_count
+            timing.offers = len(allocation.offers)
+
+            result.rounds.append(timing)
+            if progress is not None:
+                progress(timing)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+            result.committed = True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    result.total_s = round(time.perf_counter() - start, 4)
+    return result
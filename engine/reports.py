@@ -0,0 +1,430 @@
+# engine/reports.py
+"""
+Offer report export (the "Download Offers" workbook). No Qt imports, so
+this can run from scripts, benchmarks or a worker thread.
+"""
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from database import db_manager
+from engine.snapshot import load_report, load_round_snapshot, save_report
+
+
+def auto_increment_filename(base_name):
+    """
+    If base_name.xlsx exists, create base_name (1).xlsx,
+    base_name (2).xlsx, etc.
+    """
+    name, ext = os.path.splitext(base_name)
+    counter = 1
+    new_name = base_name
+
+    while os.path.exists(new_name):
+        new_name = f"{name} ({counter}){ext}"
+        counter += 1
+
+    return new_name
+
+
+# Sheets in workbook order: (sheet name, row filter over the master frame).
+# Filters are boolean masks on the normalized columns; None keeps every row.
+SHEETS = [
+    ('Offers-List', lambda m: m['offered'] == 'Y'),
+    ('Offer-24-format', None),      # built separately from the offered rows
+    ('PWD-GEN', lambda m: (m['PWD_NORM'] == 'YES') & (m['CAT_NORM'] == 'GEN')),
+    ('PWD-OBC', lambda m: (m['PWD_NORM'] == 'YES') & (m['CAT_NORM'] == 'OBC')),
+    ('PWD-SC', lambda m: (m['PWD_NORM'] == 'YES') & (m['CAT_NORM'] == 'SC')),
+    ('PWD-ST', lambda m: (m['PWD_NORM'] == 'YES') & (m['CAT_NORM'] == 'ST')),
+    ('PWD-EWS', lambda m: (m['PWD_NORM'] == 'YES') & ((m['EWS_NORM'] == 'YES') | (m['CAT_NORM'] == 'EWS'))),
+    ('General-ALL', None),
+    ('General-Female', lambda m: m['GENDER_NORM'] == 'FEMALE'),
+    ('EWS', lambda m: (m['EWS_NORM'] == 'YES') | (m['CAT_NORM'] == 'EWS')),
+    ('OBC', lambda m: m['CAT_NORM'] == 'OBC'),
+    ('OBC-Female', lambda m: (m['CAT_NORM'] == 'OBC') & (m['GENDER_NORM'] == 'FEMALE')),
+    ('SC', lambda m: m['CAT_NORM'] == 'SC'),
+    ('SC-Female', lambda m: (m['CAT_NORM'] == 'SC') & (m['GENDER_NORM'] == 'FEMALE')),
+    ('ST', lambda m: m['CAT_NORM'] == 'ST'),
+    ('ST-Female', lambda m: (m['CAT_NORM'] == 'ST') & (m['GENDER_NORM'] == 'FEMALE')),
+]
+
+OFFER_24_COLUMNS = [
+    'Application Seq No','AppStatus','Remarks','App Date','GATE Reg','Mtech Application Number',
+    'GATE Score','Candidate Name','Offered Program','Offered Program Code','Offered Category',
+    'Round No','Institute Name','Institute ID','Institute Type','Form status'
+]
+
+
+def _normalized(df, col):
+    """Stripped, upper-cased copy of df[col] as a categorical ('' when missing)."""
+    if col not in df.columns:
+        return pd.Categorical([''] * len(df))
+    return df[col].fillna('').astype(str).str.strip().str.upper().astype('category')
+
+
+def _sheet_columns(front, all_cols, columns):
+    """
+    Final column order of a sheet: front columns, then the master order, with
+    MaxGATEScore_3yrs moved right after Full_Name when both are present.
+    """
+    if 'Full_Name' in columns and 'MaxGATEScore_3yrs' in columns:
+        reordered = []
+        seen = set()
+        for c in (front + all_cols):
+            if c not in columns or c in seen:
+                continue
+            # when we hit Full_Name, append it then MaxGATEScore_3yrs
+            if c == 'Full_Name':
+                reordered.append('Full_Name')
+                seen.add('Full_Name')
+                if 'MaxGATEScore_3yrs' not in seen:
+                    reordered.append('MaxGATEScore_3yrs')
+                    seen.add('MaxGATEScore_3yrs')
+            elif c != 'MaxGATEScore_3yrs':  # skip gate col here — added after Full_Name
+                reordered.append(c)
+                seen.add(c)
+        final_cols = reordered or [c for c in (front + all_cols) if c in columns]
+    else:
+        final_cols = [c for c in (front + all_cols) if c in columns]
+
+    # safety: if somehow empty, use the sheet's own columns
+    return final_cols or list(columns)
+
+
+def _build_master(round_no, conn):
+    """
+    One row per candidate with the offered/accepted/offerCat/IsPWD columns
+    (flags read from the round's snapshot) and the *_NORM filter columns.
+    """
+    # --- load base tables ---
+    df_master = pd.read_sql_query("SELECT * FROM candidates", conn)
+
+    # normalize COAP column name
+    if 'COAP' not in df_master.columns and 'App_no' in df_master.columns:
+        df_master = df_master.rename(columns={'App_no': 'COAP'})
+
+    # --- offered / accepted / offerCat from the round's snapshot ---
+    snapshot = load_round_snapshot(conn, int(round_no))
+    snapshot.index = snapshot.index.astype(str)
+
+    df_master['COAP'] = df_master['COAP'].astype(str)
+    coap = df_master['COAP']
+    df_master['offered'] = coap.map(snapshot['offered']).fillna('')
+    df_master['accepted'] = coap.map(snapshot['accepted']).fillna('')
+    df_master['offerCat'] = coap.map(snapshot['offerCat']).fillna('')
+
+    # IsPWD column: detect existing PWD-like column names, otherwise fallback to 'Pwd'
+    pwd_col = next((c for c in df_master.columns if c.lower() in ('pwd', 'is_pwd', 'ispwd', 'physically_disabled')), None)
+    if pwd_col is None and 'Pwd' in df_master.columns:
+        pwd_col = 'Pwd'
+    if pwd_col:
+        pwd = df_master[pwd_col].fillna('').astype(str).str.strip().str.upper()
+        df_master['IsPWD'] = np.where(pwd.isin(('YES', 'Y', '1', 'TRUE')), 'Yes', 'No')
+    else:
+        df_master['IsPWD'] = 'No'  # default when no column present
+
+    # --- canonicalize gate score column so all sheets have it ---
+    gate_candidates = [
+        'MaxGATEScore_3yrs', 'MaxGateS', 'GATE Score', 'GATE25',
+        'GATE_Reg', 'GATE25RollN', 'GATE', 'GATE25Roll'
+    ]
+    gcol = next((c for c in gate_candidates if c in df_master.columns), None)
+    if gcol is not None:
+        df_master['MaxGATEScore_3yrs'] = df_master[gcol]
+
+    # otherwise try from offers table
+    if 'MaxGATEScore_3yrs' not in df_master.columns or df_master['MaxGATEScore_3yrs'].isnull().all():
+        df_off = pd.read_sql_query("SELECT * FROM offers WHERE round_no = ?", conn, params=(int(round_no),))
+        gcol = next((c for c in gate_candidates if c in df_off.columns), None)
+        if gcol is not None:
+            df_master['MaxGATEScore_3yrs'] = coap.map(dict(zip(df_off['COAP'].astype(str), df_off[gcol])))
+
+    if 'MaxGATEScore_3yrs' not in df_master.columns:
+        df_master['MaxGATEScore_3yrs'] = ''
+    df_master['MaxGATEScore_3yrs'] = pd.to_numeric(df_master['MaxGATEScore_3yrs'], errors='coerce')
+
+    # Normalized helper columns for filtering
+    df_master['CAT_NORM'] = _normalized(df_master, 'Category')
+    df_master['GENDER_NORM'] = _normalized(df_master, 'Gender')
+    df_master['EWS_NORM'] = _normalized(df_master, 'Ews')
+    df_master['PWD_NORM'] = _normalized(df_master, pwd_col if pwd_col else 'Pwd')
+
+    # Remove Adm_cat (if present)
+    df_master = df_master.drop(columns=[c for c in ('Adm_cat', 'adm_cat', 'AdmCat') if c in df_master.columns])
+    return df_master
+
+
+def _app_date():
+    return pd.Timestamp.now().strftime('%d/%b/%Y')
+
+
+def _offer_24(offered, round_no):
+    """Offer-24-format sheet from the (already ranked) offered rows."""
+    offered = offered.reset_index(drop=True)
+
+    def col_or_blank(df, col):
+        return df[col] if col in df.columns else pd.Series([''] * len(df), index=df.index)
+
+    # pick best gate column available
+    gate_candidates = ['MaxGATEScore_3yrs', 'GATE Score', 'GATE25', 'GATE_Reg', 'MaxGateS', 'GATE25RollN', 'GATE']
+    gate_col = next((c for c in gate_candidates if c in offered.columns), None)
+
+    df_offer24 = pd.DataFrame(index=offered.index)
+    # Application Seq No - try common names
+    df_offer24['Application Seq No'] = col_or_blank(offered, 'Si_NO').where(col_or_blank(offered, 'Si_NO') != '', col_or_blank(offered, 'AppNo')).where(col_or_blank(offered, 'AppNo') != '', col_or_blank(offered, 'App_no'))
+    df_offer24['AppStatus'] = 'Pending'
+    df_offer24['Remarks'] = ''
+    df_offer24['App Date'] = _app_date()
+
+    df_offer24['GATE Reg'] = offered[gate_col] if gate_col in offered.columns else ''
+    df_offer24['Mtech Application Number'] = col_or_blank(offered, 'App_no').where(col_or_blank(offered, 'App_no') != '', col_or_blank(offered, 'Mtech Application Number')).where(col_or_blank(offered, 'Mtech Application Number') != '', col_or_blank(offered, 'AppNo'))
+    df_offer24['GATE Score'] = offered[gate_col] if gate_col in offered.columns else ''
+
+    # Candidate name heuristics
+    name_col = next((c for c in ('Full_Name', 'FullName', 'Name') if c in offered.columns), None)
+    df_offer24['Candidate Name'] = offered[name_col] if name_col else col_or_blank(offered, 'FullName')
+
+    # Program/Category/Institute columns (best-effort)
+    df_offer24['Offered Program'] = offered.get('Offered Program', offered.get('branch', ''))
+    df_offer24['Offered Program Code'] = offered.get('Offered Program Code', offered.get('branch', ''))
+    df_offer24['Offered Category'] = offered.get('category', offered.get('offerCat', offered.get('offer_category', '')))
+    df_offer24['Round No'] = int(round_no)
+    df_offer24['Institute Name'] = offered['Institute Name'] if 'Institute Name' in offered.columns else 'IIT Goa'
+    df_offer24['Institute ID'] = offered['Institute ID'] if 'Institute ID' in offered.columns else ''
+    df_offer24['Institute Type'] = offered['Institute Type'] if 'Institute Type' in offered.columns else 'IIT'
+    df_offer24['Form status'] = ''
+
+    return df_offer24[[c for c in OFFER_24_COLUMNS if c in df_offer24.columns]]
+
+
+def _build_report(round_no, conn):
+    """
+    The finished report of round_no, as stored by engine.snapshot.save_report():
+    {'ranked': master frame in report row order,
+     'sheets': [(sheet name, row positions in ranked or None for all, columns)],
+     'offer_24': the Offer-24-format frame (None when nothing was offered)}.
+
+    The master frame is sorted once (offered rows first, by GATE score, the
+    rest in table order); every candidate sheet is a selection of it.
+    """
+    df_master = _build_master(round_no, conn)
+    all_cols = df_master.columns.tolist()
+
+    is_offered = df_master['offered'] == 'Y'
+    ranked = pd.concat([
+        df_master[is_offered].sort_values(by=['MaxGATEScore_3yrs'], ascending=False, kind='mergesort'),
+        df_master[~is_offered],
+    ])
+
+    # Prepare ordering: offered/IsPWD/offerCat/accepted first (Offers-List special)
+    default_cols = _sheet_columns(['offered', 'accepted'], all_cols, all_cols)
+    offer_list_cols = _sheet_columns(['offerCat', 'IsPWD', 'offered', 'accepted'], all_cols, all_cols)
+
+    offer_24 = None
+    sheets = []
+    for sheet_name, row_filter in SHEETS:
+        if sheet_name == 'Offer-24-format':
+            df_offer24 = _offer_24(ranked[ranked['offered'] == 'Y'], round_no)
+            if not df_offer24.empty:
+                offer_24 = df_offer24
+            else:
+                # no offers: an empty sheet with the candidate columns, like the other sheets
+                sheets.append((sheet_name, np.arange(0), default_cols))
+            continue
+        rows = None if row_filter is None else np.flatnonzero(row_filter(ranked).to_numpy())
+        cols = offer_list_cols if sheet_name == 'Offers-List' else default_cols
+        sheets.append((sheet_name, rows, cols))
+    return {'ranked': ranked, 'sheets': sheets, 'offer_24': offer_24}
+
+
+def _report_sheets(report):
+    """[(sheet name, DataFrame)] in workbook order from a report of _build_report()."""
+    ranked = report['ranked']
+    selections = {name: (rows, cols) for name, rows, cols in report['sheets']}
+    sheets = []
+    for sheet_name, _ in SHEETS:
+        if sheet_name not in selections:
+            # Offer-24-format: dated the day it is exported
+            sheets.append((sheet_name, report['offer_24'].assign(**{'App Date': _app_date()})))
+            continue
+        rows, cols = selections[sheet_name]
+        sheets.append((sheet_name, ranked[cols] if rows is None else ranked.iloc[rows][cols]))
+    return sheets
+
+
+def build_offer_sheets(round_no, conn):
+    """
+    [(sheet name, DataFrame)] of the offers report, rows and columns in their
+    final order.
+
+    Served from the round's stored report when there is one; otherwise the
+    report is built and stored, committing unless the caller already has a
+    transaction open.
+    """
+    was_idle = not conn.in_transaction
+    report = load_report(conn, int(round_no))
+    if report is None:
+        report = _build_report(round_no, conn)
+        save_report(conn, int(round_no), report)
+        if was_idle:
+            conn.commit()
+    return _report_sheets(report)
+
+
+# ---- Writers ----
+REPORT_FORMATS = ("xlsx", "csv", "parquet")
+WRITE_CHUNK_ROWS = 5000
+
+
+def _iter_rows(df, chunk_size=WRITE_CHUNK_ROWS):
+    """Rows of df as tuples of python values (missing -> None), converted a chunk at a time."""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_xlsx(sheets, path):
+    """
+    Write [(sheet name, DataFrame)] with openpyxl's write-only workbook: rows
+    are streamed to the file, so memory does not grow with the sheet size.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for sheet_name, df_sheet in sheets:
+        ws = wb.create_sheet(title=sheet_name[:31])
+        try:
+            ws.append([str(c) for c in df_sheet.columns])
+            for row in _iter_rows(df_sheet):
+                ws.append(row)
+        except Exception:
+            # continue writing other sheets even if one fails
+            continue
+    wb.save(path)
+
+
+def _parquet_safe(df):
+    """Object columns holding mixed values -> strings (missing stays missing)."""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _write_sheet_file(job):
+    """Write one sheet to its own file (.xlsx / .csv / .parquet); runs in a pool worker."""
+    sheet_name, df_sheet, target, fmt = job
+    if fmt == "xlsx":
+        write_xlsx([(sheet_name, df_sheet)], target)
+    elif fmt == "csv":
+        df_sheet.to_csv(target, index=False)
+    else:
+        _parquet_safe(df_sheet).to_parquet(target, index=False)
+    return target
+
+
+def _run_jobs(jobs, workers):
+    if workers <= 1:
+        return [_write_sheet_file(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_write_sheet_file, jobs))
+
+
+def write_bundle(sheets, path, fmt, workers=1):
+    """Write [(sheet name, DataFrame)] as one .csv or .parquet file per sheet into folder path."""
+    os.makedirs(path, exist_ok=True)
+    jobs = [
+        (sheet_name, df_sheet, os.path.join(path, f"{i:02d}_{sheet_name}.{fmt}"), fmt)
+        for i, (sheet_name, df_sheet) in enumerate(sheets, start=1)
+    ]
+    _run_jobs(jobs, workers)
+
+
+def write_xlsx_parallel(sheets, path, workers):
+    """
+    write_xlsx() with the sheets rendered in a process pool: every worker
+    streams one sheet into its own single-sheet workbook, then the sheet XML
+    parts are copied into a workbook skeleton holding all sheet names.
+    openpyxl writes strings inline and these sheets carry no styles, so a
+    sheet part does not depend on the rest of its workbook.
+    """
+    from openpyxl import Workbook
+
+    with tempfile.TemporaryDirectory(prefix="offers_report_") as tmp:
+        jobs = [
+            (sheet_name, df_sheet, os.path.join(tmp, f"sheet{i}.xlsx"), "xlsx")
+            for i, (sheet_name, df_sheet) in enumerate(sheets, start=1)
+        ]
+        parts = _run_jobs(jobs, workers)
+
+        skeleton = Workbook(write_only=True)
+        for sheet_name, _ in sheets:
+            skeleton.create_sheet(title=sheet_name[:31])
+        skeleton_path = os.path.join(tmp, "skeleton.xlsx")
+        skeleton.save(skeleton_path)
+
+        with zipfile.ZipFile(skeleton_path) as src, \
+                zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as out:
+            for item in src.infolist():
+                m = re.fullmatch(r"xl/worksheets/sheet(\d+)\.xml", item.filename)
+                if m is None:
+                    out.writestr(item, src.read(item))
+                    continue
+                with zipfile.ZipFile(parts[int(m.group(1)) - 1]) as part, \
+                        part.open("xl/worksheets/sheet1.xml") as part_xml, \
+                        out.open(item.filename, "w") as dest:
+                    shutil.copyfileobj(part_xml, dest)
+
+
+def export_offers(round_no, out_filename=None, conn=None, fmt="xlsx", workers=1):
+    """
+    Final exporter implementing:
+    - Offers-List (with offerCat and IsPWD first columns)
+    - Offer-24-format (detailed offered rows)
+    - PWD-GEN, PWD-OBC, PWD-SC, PWD-ST, PWD-EWS
+    - General-ALL (all offered), General-Female (all females)
+    - EWS, OBC, OBC-Female, SC, SC-Female, ST, ST-Female
+    Notes:
+    - 'offered' and 'accepted' columns are 'Y' or ''.
+    - IsPWD values are 'Yes' / 'No'.
+    - offerCat is pulled from the offers table (if present); otherwise blank.
+    - Adm_cat (if present) is removed from final outputs.
+    fmt: 'xlsx' (one workbook, streamed row by row) or 'csv' / 'parquet'
+    (a folder with one file per sheet, numbered in workbook order).
+    workers: 0 or 1 (default) writes everything in this process; more renders
+    the sheets in a process pool (opt-in, e.g. cli.py export --workers).
+    Returns the path written (never overwrites: see auto_increment_filename).
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{fmt}' (expected one of {', '.join(REPORT_FORMATS)})")
+    if out_filename is None:
+        out_filename = f"Round_{round_no}_Offers_Report"
+        if fmt == "xlsx":
+            out_filename += ".xlsx"
+
+    # Prevent overwrite → generate new unique file
+    out_filename = auto_increment_filename(out_filename)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        sheets = build_offer_sheets(round_no, conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+    if fmt == "xlsx" and workers <= 1:
+        write_xlsx(sheets, out_filename)
+    elif fmt == "xlsx":
+        write_xlsx_parallel(sheets, out_filename, workers)
+    else:
+        write_bundle(sheets, out_filename, fmt, workers)
+    return out_filename
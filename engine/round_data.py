@@ -0,0 +1,301 @@
+# engine/round_data.py
+"""
+SQLite side of a round: loads the inputs for engine.allocation.allocate()
+and writes its offers back. No Qt imports, so this can run from scripts,
+benchmarks or a worker thread.
+"""
+import difflib
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from database import db_manager
+from database.sheet_reader import read_frame
+from engine.allocation import (
+    CANDIDATE_COLUMNS, STAGE_ELIGIBLE, STAGE_SORTED, STAGE_WRITTEN,
+    CandidateTable, allocate, check_cancel, prepare_candidates, report,
+)
+from engine.snapshot import invalidate_snapshots, save_round_snapshot
+from engine.status import refresh_candidate_status
+
+# Required [key, decision] columns of each uploaded decision file, by decisions.source
+DECISION_COLUMNS = {
+    "goa": ["mtech_app_no", "applicant_decision"],
+    "other": ["mtech_app_no", "other_institute_decision"],
+    "consolidated": ["coap_reg_id", "applicant_decision"],
+}
+
+
+@dataclass
+class RoundInputs:
+    round_no: int
+    candidates: CandidateTable = field(default_factory=CandidateTable)     # ranked
+    seat_matrix: dict = field(default_factory=dict)
+    upgraded_map: dict = field(default_factory=dict)
+
+
+# ------------------------------------------------------
+# Determine candidates eligible for next round
+# ------------------------------------------------------
+# COAPs knocked out by the decisions of rounds 1..:upto, in one set-based pass:
+# - Accept & Freeze at another institute -> permanently out
+# - Reject & Wait at IIT Goa -> removed from future rounds
+# - consolidated Accept & Freeze -> out ONLY IF not frozen at IIT Goa
+EXCLUDED_COAPS_SQL = """
+    SELECT c.COAP
+    FROM candidates c
+    JOIN decisions d ON d.key = c.App_no
+    WHERE d.round_no <= :upto
+      AND c.COAP IS NOT NULL
+      AND ((d.source = 'other' AND d.decision = 'Accept and Freeze')
+           OR (d.source = 'goa' AND d.decision = 'Reject and Wait'))
+    UNION
+    SELECT d.key
+    FROM decisions d
+    WHERE d.source = 'consolidated'
+      AND d.decision = 'Accept and Freeze'
+      AND d.round_no <= :upto
+      AND NOT EXISTS (
+          SELECT 1
+          FROM candidates g
+          JOIN decisions gd ON gd.key = g.App_no
+          WHERE g.COAP = d.key
+            AND gd.source = 'goa'
+            AND gd.decision = 'Accept and Freeze'
+            AND gd.round_no <= :upto
+      )
+"""
+
+# Everyone with a GATE score minus the excluded set; :upto = 0 gives round 1
+ELIGIBLE_SQL = f"""
+    FROM candidates
+    WHERE MaxGATEScore_3yrs IS NOT NULL
+      AND COAP IS NOT NULL
+      AND COAP NOT IN ({EXCLUDED_COAPS_SQL})
+"""
+
+RANK_ORDER_SQL = "ORDER BY MaxGATEScore_3yrs DESC, HSSC_per DESC, SSC_per DESC"
+
+
+def _get_eligible_candidates_for_next_round(current_round, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT DISTINCT COAP {ELIGIBLE_SQL}", {"upto": current_round})
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def load_eligible_candidates(round_no, conn):
+    """
+    CandidateTable of everyone taking part in round_no, ranked for allocation
+    straight from one query (round 1: everyone with a GATE score) and
+    normalized column-wise while loading.
+    """
+    df = pd.read_sql_query(
+        f"SELECT {', '.join(CANDIDATE_COLUMNS)} {ELIGIBLE_SQL} {RANK_ORDER_SQL}",
+        conn, params={"upto": round_no - 1},
+    )
+    return prepare_candidates(df)
+
+
+# ------------------------------------------------------
+# Load seat matrix and apply confirmed seats
+# ------------------------------------------------------
+def _get_seat_matrix_with_confirmed(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT category, set_seats, seats_allocated FROM seat_matrix")
+
+    return {
+        cat.strip(): {
+            "total": total or 0,
+            "allocated": alloc or 0       # <-- use DB allocated value
+        }
+        for cat, total, alloc in cursor.fetchall()
+    }
+
+
+def _get_upgraded_candidates(previous_round, conn):
+    if previous_round < 1:
+        return {}
+
+    # Candidates who chose 'Retain and Wait' OR 'Accept and Freeze' in the
+    # previous round keep their seat as the last-priority fallback.
+    df = pd.read_sql_query("""
+        SELECT o.COAP, o.category
+        FROM offers o
+        JOIN candidates c ON o.COAP = c.COAP
+        JOIN decisions d
+            ON d.key = c.App_no AND d.source = 'goa' AND d.round_no = o.round_no
+        WHERE o.round_no = ?
+          AND d.decision IN ('Retain and Wait','Accept and Freeze')
+    """, conn, params=(previous_round,))
+    return df.set_index("COAP")["category"].to_dict()
+
+
+def load_round_inputs(round_no, conn, progress=None, should_cancel=None):
+    # eligibility and ranking come back from the same query
+    eligible = load_eligible_candidates(round_no, conn)
+    report(progress, STAGE_ELIGIBLE)
+    check_cancel(should_cancel)
+
+    inputs = RoundInputs(round_no=round_no)
+    if not eligible:
+        return inputs
+    inputs.upgraded_map = _get_upgraded_candidates(round_no - 1, conn)
+    inputs.candidates = eligible
+    inputs.seat_matrix = _get_seat_matrix_with_confirmed(conn)
+    report(progress, STAGE_SORTED)
+    check_cancel(should_cancel)
+    return inputs
+
+
+# ------------------------------------------------------
+# Store the three decision files of a round
+# ------------------------------------------------------
+def _key_text(value):
+    """Application numbers read from Excel as 12345.0 are stored as '12345'."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def auto_match_columns(df, required_cols):
+    """
+    Automatically match uploaded DataFrame columns to required DB columns.
+
+    - Exact match preferred
+    - If not found, fuzzy match (similar/related)
+    - Ignores extra columns
+    - Raises error if no possible match is found
+    """
+
+    col_map = {}
+    uploaded_cols = [c.lower().strip().replace(" ", "_") for c in df.columns]
+
+    for req in required_cols:
+        req_norm = req.lower()
+
+        # --- 1. Exact match ---
+        if req_norm in uploaded_cols:
+            idx = uploaded_cols.index(req_norm)
+            col_map[df.columns[idx]] = req
+            continue
+
+        # --- 2. Fuzzy match ---
+        close = difflib.get_close_matches(req_norm, uploaded_cols, n=1, cutoff=0.55)
+
+        if close:
+            idx = uploaded_cols.index(close[0])
+            col_map[df.columns[idx]] = req
+            continue
+
+        # --- 3. No match found → error ---
+        raise ValueError(f"Required column '{req}' not found or matched in uploaded file.")
+
+    # Apply rename
+    df = df.rename(columns=col_map)
+
+    # Keep only required columns
+    df = df[required_cols]
+
+    return df
+
+
+def read_decision_file(path, col_map):
+    """
+    The mapped columns of one uploaded decision file, renamed to DB columns.
+    col_map: {DB column: file column}. Returns None if nothing is mapped.
+    """
+    if path is None or not col_map:
+        return None
+    # Read only the mapped columns; the same file column may feed several DB columns
+    usecols = list(dict.fromkeys(col_map.values()))
+    src = read_frame(path, usecols=usecols)
+    return pd.DataFrame({db: src[col] for db, col in col_map.items()})
+
+
+def read_round_decisions(files):
+    """
+    Read and column-match the three decision files of a round.
+    files: (path, col_map) for goa, other and consolidated, in that order.
+    Returns (df_goa, df_other, df_cons) for store_round_decisions().
+    """
+    return tuple(
+        auto_match_columns(read_decision_file(path, col_map), DECISION_COLUMNS[source])
+        for source, (path, col_map) in zip(DECISION_COLUMNS, files)
+    )
+
+
+def store_round_decisions(conn, round_no, df_goa, df_other, df_cons):
+    """
+    Replace the decisions of round_no with the given (already column-matched)
+    DataFrames and refresh the managed indexes. Snapshots of round_no onwards
+    are dropped. candidate_status is left to execute_round(); callers that store
+    decisions without running a round must call refresh_candidate_status().
+    Does not commit, so it can share a transaction with execute_round().
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM decisions WHERE round_no = ?", (round_no,))
+
+    for source, df in (("goa", df_goa), ("other", df_other), ("consolidated", df_cons)):
+        key_col, decision_col = DECISION_COLUMNS[source]
+        df = df[[key_col, decision_col]].dropna(subset=[key_col]).astype(object)
+        df = df.where(pd.notnull(df), None)
+        cursor.executemany(
+            "INSERT OR REPLACE INTO decisions (round_no, source, key, decision) VALUES (?, ?, ?, ?)",
+            [(round_no, source, _key_text(key), decision) for key, decision in df.itertuples(index=False, name=None)]
+        )
+
+    db_manager.ensure_indexes(conn)
+    invalidate_snapshots(conn, round_no)
+
+
+# ------------------------------------------------------
+# Save offers
+# ------------------------------------------------------
+def save_offers(conn, offer_rows):
+    cursor = conn.cursor()
+    db_manager.create_offers_table(cursor)
+    cursor.executemany("""
+        INSERT OR REPLACE INTO offers
+        (round_no, COAP, Full_Name, category, MaxGATEScore_3yrs, offer_status)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, offer_rows)
+
+
+def execute_round(round_no, conn=None, write=True, progress=None, should_cancel=None, commit=True):
+    """
+    Load inputs, allocate and (unless write=False) store the offers for round_no.
+    Returns the AllocationResult; eligible_count == 0 means nothing was run.
+    commit=False leaves the written offers in the caller's open transaction.
+
+    progress/should_cancel are passed through to allocate(); a cancelled run
+    raises AllocationCancelled before anything is committed.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        inputs = load_round_inputs(round_no, conn, progress, should_cancel)
+        if not inputs.candidates:
+            return allocate(round_no, [], inputs.seat_matrix)
+
+        result = allocate(round_no, inputs.candidates, inputs.seat_matrix, inputs.upgraded_map,
+                          progress=progress, should_cancel=should_cancel)
+        if write:
+            check_cancel(should_cancel)
+            save_offers(conn, result.offer_rows())
+            save_round_snapshot(conn, round_no)
+            refresh_candidate_status(conn)
+            if commit:
+                conn.commit()
+            report(progress, STAGE_WRITTEN)
+        return result
+    finally:
+        if own_conn:
+            conn.close()
@@ -0,0 +1,155 @@
+# engine/simulation.py
+"""
+What-if runs: allocate one round against several seat-matrix variants and
+compare each with the current seat matrix, category by category.
+
+The round's inputs are loaded once; worker processes receive that snapshot
+when they start (not once per variant) and only read it. Nothing is
+written to the database.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from database import db_manager
+from engine.allocation import allocate
+from engine.round_data import load_round_inputs
+
+# Snapshot (RoundInputs) of the round being simulated, per worker process
+_snapshot = None
+
+
+@dataclass
+class VariantResult:
+    name: str
+    seat_matrix: dict = field(default_factory=dict)      # the variant's seat matrix
+    offers: int = 0
+    by_category: dict = field(default_factory=dict)      # category -> {"baseline", "variant", "delta", "gained", "lost"}
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "offers": self.offers,
+            "by_category": {
+                cat: {k: d[k] for k in ("baseline", "variant", "delta")}
+                for cat, d in self.by_category.items()
+            },
+        }
+
+
+@dataclass
+class SimulationResult:
+    round_no: int
+    eligible_count: int = 0
+    baseline: dict = field(default_factory=dict)          # category -> offers with the current seat matrix
+    variants: list = field(default_factory=list)          # VariantResult, in input order
+
+    def summary(self):
+        return {
+            "round_no": self.round_no,
+            "eligible": self.eligible_count,
+            "baseline": self.baseline,
+            "variants": [v.summary() for v in self.variants],
+        }
+
+
+def apply_variant(seat_matrix, changes):
+    """
+    Copy of seat_matrix with changes applied. changes maps a seat key to its
+    new total (int) or to a full {"total", "allocated"} entry.
+    """
+    seats = {k: dict(v) for k, v in seat_matrix.items()}
+    for key, value in changes.items():
+        entry = seats.setdefault(key, {"total": 0, "allocated": 0})
+        if isinstance(value, dict):
+            entry.update(value)
+        else:
+            entry["total"] = int(value)
+    return seats
+
+
+def _offers_by_category(result):
+    """{category: set of offered COAPs}"""
+    out = {}
+    for o in result.offers:
+        out.setdefault(o.category, set()).add(o.coap)
+    return out
+
+
+def _init_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _run_variant(seat_matrix):
+    """Allocate the snapshot against seat_matrix (in a worker process)."""
+    inputs = _snapshot
+    result = allocate(inputs.round_no, inputs.candidates, seat_matrix, inputs.upgraded_map)
+    return _offers_by_category(result)
+
+
+def _diff(name, seat_matrix, baseline, variant):
+    by_category = {}
+    for cat in sorted(set(baseline) | set(variant)):
+        before, after = baseline.get(cat, set()), variant.get(cat, set())
+        by_category[cat] = {
+            "baseline": len(before),
+            "variant": len(after),
+            "delta": len(after) - len(before),
+            "gained": sorted(after - before),
+            "lost": sorted(before - after),
+        }
+    return VariantResult(
+        name=name,
+        seat_matrix=seat_matrix,
+        offers=sum(len(c) for c in variant.values()),
+        by_category=by_category,
+    )
+
+
+def simulate(round_no, variants, conn=None, workers=None):
+    """
+    Allocate round_no once per seat-matrix variant, without writing anything.
+
+    - variants: {name: changes} or a list of changes (named "variant 1", ...);
+      changes are applied to the current seat matrix with apply_variant()
+    - workers: process count (default: CPU count, capped at the number of
+      variants); 0 or 1 runs everything in this process
+    Returns a SimulationResult; each variant is diffed against the current
+    seat matrix per offered category.
+    """
+    if not isinstance(variants, dict):
+        variants = {f"variant {i}": changes for i, changes in enumerate(variants, start=1)}
+
+    own_conn = conn is None
+    if own_conn:
+        conn = db_manager.get_connection()
+    try:
+        inputs = load_round_inputs(round_no, conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+    sim = SimulationResult(round_no=round_no, eligible_count=len(inputs.candidates))
+    if not inputs.candidates:
+        return sim
+
+    matrices = [apply_variant(inputs.seat_matrix, changes) for changes in variants.values()]
+
+    _init_worker(inputs)
+    baseline = _run_variant(inputs.seat_matrix)
+    sim.baseline = {cat: len(coaps) for cat, coaps in sorted(baseline.items())}
+
+    if workers is None:
+        workers = min(len(matrices), os.cpu_count() or 1)
+    if workers <= 1 or len(matrices) <= 1:
+        outcomes = [_run_variant(m) for m in matrices]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(inputs,)) as pool:
+            outcomes = list(pool.map(_run_variant, matrices))
+
+    sim.variants = [
+        _diff(name, matrix, baseline, outcome)
+        for name, matrix, outcome in zip(variants, matrices, outcomes)
+    ]
+    return sim
@@ -0,0 +1,163 @@
+# engine/snapshot.py
+"""
+Per-round report snapshots.
+
+round_snapshot holds, for every candidate that was offered a seat in a
+round or has accepted one by then, the report flags of that round:
+offered ('Y'/''), accepted ('Y'/'') and offerCat. snapshot_rounds lists
+the rounds whose snapshot is complete.
+
+report_cache holds the finished report of a round (see engine.reports),
+stored the first time the round is exported, so repeat exports only write it.
+It is plain data (Parquet frames, JSON sheet selections); without pyarrow
+nothing is stored and every export builds the report.
+
+- execute_round() saves the snapshot in the transaction that writes the offers
+- new decisions for round N (upload, correction, delete) invalidate rounds >= N
+- new or changed candidate rows drop every stored report (db_manager.clear_report_cache)
+- exports call ensure_round_snapshot() and read the flags from the table
+"""
+import datetime
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from database import db_manager
+
+# Bump when the layout of a stored report changes: older ones are rebuilt
+REPORT_CACHE_VERSION = 2
+
+
+def save_round_snapshot(conn, round_no):
+    """(Re)build the snapshot of round_no from offers and decisions. Does not commit."""
+    cursor = conn.cursor()
+    db_manager.create_snapshot_tables(cursor)
+    cursor.execute("DELETE FROM round_snapshot WHERE round_no = ?", (round_no,))
+    cursor.execute("DELETE FROM report_cache WHERE round_no = ?", (round_no,))
+    cursor.execute("""
+        INSERT INTO round_snapshot (round_no, COAP, offered, accepted, offerCat)
+        SELECT :round_no, COAP, MAX(offered), MAX(accepted), MAX(offerCat)
+        FROM (
+            SELECT COAP, 'Y' AS offered, '' AS accepted, category AS offerCat
+            FROM offers
+            WHERE round_no = :round_no
+            UNION ALL
+            SELECT key, '', 'Y', ''
+            FROM decisions
+            WHERE source IN ('goa', 'consolidated')
+              AND decision = 'Accept and Freeze'
+              AND round_no <= :round_no
+        )
+        WHERE COAP IS NOT NULL
+        GROUP BY COAP
+    """, {"round_no": round_no})
+    cursor.execute(
+        "INSERT OR REPLACE INTO snapshot_rounds (round_no, created_at) VALUES (?, ?)",
+        (round_no, datetime.datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def invalidate_snapshots(conn, from_round):
+    """Drop the snapshots and stored reports of rounds >= from_round. Does not commit."""
+    cursor = conn.cursor()
+    db_manager.create_snapshot_tables(cursor)
+    cursor.execute("DELETE FROM round_snapshot WHERE round_no >= ?", (from_round,))
+    cursor.execute("DELETE FROM snapshot_rounds WHERE round_no >= ?", (from_round,))
+    cursor.execute("DELETE FROM report_cache WHERE round_no >= ?", (from_round,))
+
+
+def ensure_round_snapshot(conn, round_no):
+    """
+    Build the snapshot of round_no if it is missing. Commits the new snapshot
+    unless the caller already has a transaction open.
+    """
+    cursor = conn.cursor()
+    db_manager.create_snapshot_tables(cursor)
+    cursor.execute("SELECT 1 FROM snapshot_rounds WHERE round_no = ?", (round_no,))
+    if cursor.fetchone() is not None:
+        return
+    was_idle = not conn.in_transaction
+    save_round_snapshot(conn, round_no)
+    if was_idle:
+        conn.commit()
+
+
+def load_round_snapshot(conn, round_no):
+    """DataFrame (index COAP; offered, accepted, offerCat) of round_no, building the snapshot first if needed."""
+    ensure_round_snapshot(conn, round_no)
+    return pd.read_sql_query(
+        "SELECT COAP, offered, accepted, offerCat FROM round_snapshot WHERE round_no = ?",
+        conn, params=(round_no,), index_col="COAP",
+    )
+
+
+def _frame_bytes(df):
+    """
+    df as Parquet bytes; ValueError if it would not read back with the same
+    dtypes (object columns of plain strings may come back as str).
+    """
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    data = buf.getvalue()
+    back = pd.read_parquet(io.BytesIO(data)).dtypes
+    for col, dtype in df.dtypes.items():
+        if back[col] != dtype and not (dtype == object and isinstance(back[col], pd.StringDtype)):
+            raise ValueError(f"column {col!r} does not round-trip through Parquet")
+    return data
+
+
+def save_report(conn, round_no, report):
+    """
+    Store the finished report of round_no (see engine.reports._build_report):
+    the frames as Parquet, the sheet selections as JSON. Returns False, and
+    stores nothing, when a frame cannot be stored exactly (no pyarrow, or
+    columns mixing numbers and text). Does not commit.
+    """
+    try:
+        ranked = _frame_bytes(report["ranked"])
+        offer_24 = None if report["offer_24"] is None else _frame_bytes(report["offer_24"])
+    except (ImportError, TypeError, ValueError):
+        return False
+    sheets = json.dumps([
+        [name, None if rows is None else rows.tolist(), list(cols)]
+        for name, rows, cols in report["sheets"]
+    ])
+    cursor = conn.cursor()
+    db_manager.create_snapshot_tables(cursor)
+    cursor.execute(
+        "INSERT OR REPLACE INTO report_cache (round_no, version, created_at, sheets, ranked, offer_24) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (round_no, REPORT_CACHE_VERSION, datetime.datetime.now().isoformat(timespec="seconds"),
+         sheets, ranked, offer_24),
+    )
+    return True
+
+
+def load_report(conn, round_no):
+    """
+    The stored report of round_no, or None if there is none. An entry of an
+    older layout, or one that cannot be read, is dropped (not committed) so
+    the caller rebuilds it.
+    """
+    if not db_manager.has_table(conn, "report_cache"):
+        return None
+    row = conn.execute(
+        "SELECT version, sheets, ranked, offer_24 FROM report_cache WHERE round_no = ?", (round_no,),
+    ).fetchone()
+    if row is None:
+        return None
+    version, sheets, ranked, offer_24 = row
+    try:
+        if version != REPORT_CACHE_VERSION:
+            raise ValueError(f"report cache version {version}")
+        return {
+            "ranked": pd.read_parquet(io.BytesIO(ranked)),
+            "sheets": [(name, None if rows is None else np.asarray(rows, dtype=np.int64), cols)
+                       for name, rows, cols in json.loads(sheets)],
+            "offer_24": None if offer_24 is None else pd.read_parquet(io.BytesIO(offer_24)),
+        }
+    except Exception:
+        conn.execute("DELETE FROM report_cache WHERE round_no = ?", (round_no,))
+        return None
@@ -0,0 +1,153 @@
+# engine/status.py
+"""
+Candidate offer/decision status (the calculated fields of the detail dialog).
+
+- Offered:              Y if the candidate has an offer, N if accepted elsewhere
+- Accepted:             Y / N (latest IIT Goa Accept / Reject), R (only retained),
+                        E (accepted elsewhere, consolidated file; takes precedence)
+- OfferCat/OfferedRound: the latest offer that is not a retained one (else the latest)
+- isOfferPwd:           Yes if that offer is a PWD seat
+- RetainRound:          latest IIT Goa "Retain and Wait"
+- RejectOrAcceptRound:  round of the decision behind Accepted
+Decisions only count up to the candidate's latest offered round.
+
+STATUS_SQL computes all of it for a set of candidates in one statement.
+candidate_status holds the result for every candidate with an offer (everyone
+else has no status); it is recomputed in bulk whenever offers or decisions
+change, so readers look a candidate up by COAP instead of resolving it.
+"""
+from database import db_manager
+
+STATUS_FIELDS = (
+    "Offered", "Accepted", "OfferCat", "isOfferPwd",
+    "OfferedRound", "RetainRound", "RejectOrAcceptRound",
+)
+
+# {candidates}: SELECT of the candidates to resolve (COAP, App_no columns)
+STATUS_SQL = """
+    WITH cand AS (
+        {candidates}
+    ),
+    ranked_offers AS (
+        SELECT o.COAP, o.round_no, o.category, o.offer_status,
+               MAX(o.round_no) OVER (PARTITION BY o.COAP) AS max_round,
+               ROW_NUMBER() OVER (
+                   PARTITION BY o.COAP
+                   ORDER BY instr(upper(IFNULL(o.offer_status, '')), 'RETAINED') > 0, o.round_no DESC
+               ) AS pick
+        FROM cand c
+        CROSS JOIN offers o ON o.COAP = c.COAP     -- CROSS: look offers up per candidate
+    ),
+    offer AS (
+        SELECT * FROM ranked_offers WHERE pick = 1
+    ),
+    goa AS (
+        SELECT c.COAP,
+               MAX(CASE WHEN d.decision IN ('Accept and Freeze', 'Reject and Wait') THEN d.round_no END) AS final_round,
+               MAX(CASE WHEN d.decision = 'Retain and Wait' THEN d.round_no END) AS retain_round
+        FROM cand c
+        JOIN offer o ON o.COAP = c.COAP
+        JOIN decisions d
+          ON d.key = c.App_no AND d.source = 'goa' AND d.round_no <= o.max_round
+        GROUP BY c.COAP
+    ),
+    elsewhere AS (
+        SELECT c.COAP, MIN(d.round_no) AS accept_round
+        FROM cand c
+        JOIN offer o ON o.COAP = c.COAP
+        JOIN decisions d
+          ON d.key = c.COAP AND d.source = 'consolidated'
+         AND d.decision = 'Accept and Freeze' AND d.round_no <= o.max_round
+        GROUP BY c.COAP
+    )
+    SELECT
+        c.COAP AS COAP,
+        c.App_no AS App_no,
+        CASE WHEN e.accept_round IS NOT NULL THEN 'N'
+             WHEN o.COAP IS NOT NULL THEN 'Y' END AS Offered,
+        CASE WHEN e.accept_round IS NOT NULL THEN 'E'
+             WHEN g.final_round IS NOT NULL THEN
+                 CASE fd.decision WHEN 'Accept and Freeze' THEN 'Y' ELSE 'N' END
+             WHEN g.retain_round IS NOT NULL THEN 'R' END AS Accepted,
+        CASE WHEN e.accept_round IS NULL THEN o.category END AS OfferCat,
+        CASE WHEN e.accept_round IS NOT NULL OR o.COAP IS NULL THEN NULL
+             WHEN instr(upper(IFNULL(o.category, '')), '_PWD') > 0
+               OR instr(upper(IFNULL(o.offer_status, '')), 'PWD') > 0 THEN 'Yes'
+             ELSE 'No' END AS isOfferPwd,
+        CASE WHEN e.accept_round IS NULL THEN o.round_no END AS OfferedRound,
+        CASE WHEN e.accept_round IS NULL THEN g.retain_round END AS RetainRound,
+        COALESCE(e.accept_round, g.final_round) AS RejectOrAcceptRound
+    FROM cand c
+    LEFT JOIN offer o ON o.COAP = c.COAP
+    LEFT JOIN goa g ON g.COAP = c.COAP
+    LEFT JOIN decisions fd
+      ON fd.key = c.App_no AND fd.source = 'goa' AND fd.round_no = g.final_round
+    LEFT JOIN elsewhere e ON e.COAP = c.COAP
+"""
+
+
+# everyone with a status: candidates that have been offered a seat
+OFFERED_CANDIDATES_SQL = """
+    SELECT c.COAP, c.App_no
+    FROM candidates c
+    WHERE c.COAP IN (SELECT COAP FROM offers)
+"""
+
+
+def refresh_candidate_status(conn):
+    """Recompute candidate_status for the whole pool. Does not commit."""
+    cursor = conn.cursor()
+    db_manager.create_status_table(cursor)
+    cursor.execute("DELETE FROM candidate_status")
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO candidate_status (COAP, App_no, {", ".join(STATUS_FIELDS)})
+        SELECT COAP, App_no, {", ".join(STATUS_FIELDS)}
+        FROM ({STATUS_SQL.format(candidates=OFFERED_CANDIDATES_SQL)})
+    """)
+    db_manager.ensure_indexes(conn, analyze=False)
+
+
+def ensure_candidate_status(conn):
+    """
+    Create and fill candidate_status if this database does not have it yet
+    (e.g. offers generated before it existed). Commits the new table unless
+    the caller already has a transaction open.
+    """
+    if db_manager.has_table(conn, "candidate_status"):
+        return
+    was_idle = not conn.in_transaction
+    refresh_candidate_status(conn)
+    if was_idle:
+        conn.commit()
+
+
+def resolve_candidate_status(conn, coap):
+    """
+    Candidate row of coap plus its STATUS_FIELDS ("NULL" when not set), read
+    from candidate_status. Returns {} when there is no such candidate.
+    """
+    ensure_candidate_status(conn)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT cd.*, {", ".join(f"s.{f}" for f in STATUS_FIELDS)}
+        FROM candidates cd
+        LEFT JOIN candidate_status s ON s.COAP = cd.COAP
+        WHERE cd.COAP = ?
+        LIMIT 1
+    """, (coap,))
+    row = cursor.fetchone()
+    if row is None:
+        return {}
+    data = dict(row)
+    for field in STATUS_FIELDS:
+        if data[field] is None:
+            data[field] = "NULL"
+    return data
+
+
+def status_summary(conn):
+    """{Accepted code: count} over the whole pool ('-' = offered, no decision yet)."""
+    ensure_candidate_status(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT IFNULL(Accepted, '-'), COUNT(*) FROM candidate_status GROUP BY 1 ORDER BY 1")
+    return dict(cursor.fetchall())
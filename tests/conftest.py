@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_candidates, make_round_decisions, make_seat_matrix, write_frame
+from database import db_manager
+from database.bulk_import import bulk_insert_candidates
+from engine.round_data import execute_round, store_round_decisions
+
+# tests/fixtures/baseline_offers_2000_seed0.csv was produced from this season
+SEASON_SIZE = 2000
+SEASON_SEED = 0
+SEASON_ROUNDS = 4
+
+DECISION_SOURCES = ("goa", "other", "consolidated")
+OFFERS_SQL = "SELECT round_no, COAP, Full_Name, category, MaxGATEScore_3yrs, offer_status FROM offers"
+
+
+def read_offers(conn):
+    return pd.read_sql_query(f"{OFFERS_SQL} ORDER BY round_no, COAP", conn)
+
+
+def _round_offers(conn, round_no):
+    return pd.read_sql_query("""
+        SELECT o.COAP, c.App_no
+        FROM offers o JOIN candidates c ON c.COAP = o.COAP
+        WHERE o.round_no = ?
+        ORDER BY o.COAP
+    """, conn, params=(round_no,))
+
+
+@pytest.fixture
+def season(tmp_path, monkeypatch):
+    """
+    A synthetic season of SEASON_ROUNDS rounds: round 1 allocated, then the
+    synthetic decisions of every round stored (and written to decision_dir,
+    named for engine.replay) before the next one.
+    """
+    monkeypatch.setattr(db_manager, "DB_NAME", str(tmp_path / "season.db"))
+    db_manager.init_db()
+    conn = db_manager.get_connection()
+
+    candidates = make_candidates(SEASON_SIZE, SEASON_SEED)
+    bulk_insert_candidates(candidates, list(candidates.columns), conn=conn)
+    conn.executemany(
+        "INSERT OR REPLACE INTO seat_matrix (category, set_seats, seats_allocated, seats_booked) VALUES (?, ?, ?, ?)",
+        [(cat, int(total), int(alloc), int(booked))
+         for cat, total, alloc, booked in make_seat_matrix(SEASON_SIZE).itertuples(index=False, name=None)],
+    )
+    conn.commit()
+
+    decision_dir = tmp_path / "decisions"
+    decision_dir.mkdir()
+    for round_no in range(1, SEASON_ROUNDS + 1):
+        if round_no > 1:
+            decisions = make_round_decisions(_round_offers(conn, round_no - 1), candidates, round_no - 1, SEASON_SEED)
+            for source, df in zip(DECISION_SOURCES, decisions):
+                write_frame(df, decision_dir / f"round{round_no - 1}_{source}.csv")
+            store_round_decisions(conn, round_no - 1, *decisions)
+        execute_round(round_no, conn=conn)
+
+    yield SimpleNamespace(conn=conn, candidates=candidates, decision_dir=decision_dir)
+    conn.close()
+    db_manager.close_all_connections()
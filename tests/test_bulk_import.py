@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from database import db_manager
+from database.bulk_import import IMPORT_PRAGMAS, bulk_insert_candidates
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, "DB_NAME", str(tmp_path / "import.db"))
+    db_manager.init_db()
+    conn = db_manager.get_connection()
+    yield conn
+    conn.close()
+    db_manager.close_all_connections()
+
+
+def _frame(n):
+    return pd.DataFrame({"COAP": [f"COAP{i:04d}" for i in range(n)],
+                         "Full_Name": [f"Name {i}" for i in range(n)]})
+
+
+def test_import_restores_pooled_pragmas(conn):
+    before = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    assert bulk_insert_candidates(_frame(20), ["COAP", "Full_Name"], conn=conn) == 20
+    after = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    assert after == before
+
+
+def test_failed_import_restores_pooled_pragmas(conn):
+    before = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    with pytest.raises(KeyError):
+        bulk_insert_candidates(_frame(5), ["COAP", "No_Such_Column"], conn=conn)
+    after = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    assert after == before
+    assert conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0] == 0
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+from database import db_manager
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "pool.db"
+    monkeypatch.setattr(db_manager, "DB_NAME", str(path))
+    conn = db_manager.get_connection()
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.commit()
+    conn.close()
+    yield path
+    db_manager.close_all_connections()
+
+
+def _names(path):
+    with sqlite3.connect(path) as fresh:
+        return [r[0] for r in fresh.execute("SELECT name FROM items ORDER BY name")]
+
+
+def test_nested_close_keeps_outer_transaction(db_path):
+    outer = db_manager.get_connection()
+    outer.execute("INSERT INTO items VALUES ('outer')")
+
+    inner = db_manager.get_connection()     # e.g. a helper called mid-import
+    assert inner is outer
+    inner.execute("SELECT COUNT(*) FROM items").fetchone()
+    inner.close()
+
+    assert outer.in_transaction
+    outer.execute("INSERT INTO items VALUES ('outer 2')")
+    outer.commit()
+    outer.close()
+
+    assert _names(db_path) == ["outer", "outer 2"]
+
+
+def test_close_rolls_back_own_transaction(db_path):
+    outer = db_manager.get_connection()
+    outer.execute("INSERT INTO items VALUES ('discarded')")
+
+    inner = db_manager.get_connection()
+    inner.close()
+    outer.close()       # never committed, so it is undone like a real close
+
+    assert _names(db_path) == []
+    conn = db_manager.get_connection()
+    assert not conn.in_transaction
+    conn.close()
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from conftest import SEASON_ROUNDS
+from engine.reports import build_offer_sheets, write_xlsx, write_xlsx_parallel
+
+
+def test_parallel_writer_matches_streamed_workbook(season, tmp_path):
+    sheets = build_offer_sheets(SEASON_ROUNDS, season.conn)
+    write_xlsx(sheets, tmp_path / "streamed.xlsx")
+    write_xlsx_parallel(sheets, tmp_path / "parallel.xlsx", workers=2)
+
+    streamed = pd.read_excel(tmp_path / "streamed.xlsx", sheet_name=None)
+    parallel = pd.read_excel(tmp_path / "parallel.xlsx", sheet_name=None)
+    assert list(parallel) == list(streamed) == [name[:31] for name, _ in sheets]
+    for name, df in streamed.items():
+        pd.testing.assert_frame_equal(parallel[name], df, obj=name)
+    assert sum(len(df) for df in streamed.values()) > 0
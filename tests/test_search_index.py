@@ -0,0 +1,53 @@
+import pytest
+
+from database import db_manager
+from database.bulk_import import bulk_insert_candidates
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, "DB_NAME", str(tmp_path / "search.db"))
+    yield
+    db_manager.close_all_connections()
+
+
+def _load(conn):
+    rows = [
+        {"COAP": f"COAP{i:04d}", "App_no": f"CS{i:05d}", "Email": f"user{i}@mail.test", "Full_Name": f"Name {i}"}
+        for i in range(50)
+    ]
+    import pandas as pd
+    bulk_insert_candidates(pd.DataFrame(rows), list(rows[0]), conn=conn)
+
+
+def _hits(conn, text):
+    return [r["coap_id"] for r in db_manager.search_candidates(conn, text, limit=100)]
+
+
+def test_index_follows_update_and_delete(db):
+    db_manager.init_db()
+    conn = db_manager.get_connection()
+    _load(conn)
+    assert db_manager.has_table(conn, "candidates_search")
+
+    conn.execute("UPDATE candidates SET Full_Name = 'Zebediah Quux' WHERE COAP = 'COAP0007'")
+    conn.execute("DELETE FROM candidates WHERE COAP = 'COAP0008'")
+    conn.commit()
+
+    assert _hits(conn, "Zebediah") == ["COAP0007"]
+    assert _hits(conn, "Name 7") == []
+    assert _hits(conn, "COAP0008") == []
+    conn.close()
+
+
+def test_search_falls_back_to_like_without_trigram(db, monkeypatch):
+    monkeypatch.setattr(db_manager, "SEARCH_TOKENIZER", "no_such_tokenizer")
+    db_manager.init_db()        # must not fail on an SQLite without the tokenizer
+    conn = db_manager.get_connection()
+    _load(conn)
+    assert not db_manager.has_table(conn, "candidates_search")
+
+    assert _hits(conn, "user12@") == ["COAP0012"]
+    assert db_manager.count_search_matches(conn, "Name 1") == 11     # Name 1, Name 10..19
+    conn.close()
+
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from conftest import SEASON_ROUNDS, read_offers
+from engine.incremental import correct_decisions
+from engine.replay import replay_season
+from engine.round_data import DECISION_COLUMNS
+from engine.status import STATUS_FIELDS
+
+BASELINE_OFFERS = "tests/fixtures/baseline_offers_2000_seed0.csv"
+
+
+def _status_table(conn):
+    return pd.read_sql_query(f"SELECT COAP, {', '.join(STATUS_FIELDS)} FROM candidate_status ORDER BY COAP", conn)
+
+
+def test_offers_match_baseline(season, request):
+    # rounds generated by the original per-round-table run_round on the same season
+    expected = pd.read_csv(request.config.rootpath / BASELINE_OFFERS, dtype={"COAP": str})
+    pd.testing.assert_frame_equal(read_offers(season.conn), expected, check_dtype=False)
+
+
+def _corrections(conn, round_no):
+    """Flip a few IIT Goa decisions, drop one, and mark two candidates as taken elsewhere."""
+    goa = [row[0] for row in conn.execute(
+        "SELECT key FROM decisions WHERE round_no = ? AND source = 'goa' ORDER BY key", (round_no,))]
+    flips = ["Reject and Wait", "Accept and Freeze", "Retain and Wait"]
+    corrections = [("goa", key, flips[i % 3]) for i, key in enumerate(goa[:6])]
+    corrections.append(("goa", goa[6], None))
+    waiting = conn.execute(f"""
+        SELECT COAP, App_no FROM candidates
+        WHERE COAP IN (SELECT COAP FROM offers WHERE round_no = {round_no + 1})
+        ORDER BY COAP LIMIT 2
+    """).fetchall()
+    corrections.append(("other", waiting[0]["App_no"], "Accept and Freeze"))
+    corrections.append(("consolidated", waiting[1]["COAP"], "Accept and Freeze"))
+    return corrections
+
+
+def _apply_to_files(decision_dir, round_no, corrections):
+    for source in ("goa", "other", "consolidated"):
+        path = decision_dir / f"round{round_no}_{source}.csv"
+        key_col, decision_col = DECISION_COLUMNS[source]
+        df = pd.read_csv(path, dtype=str)
+        for src, key, decision in corrections:
+            if src != source:
+                continue
+            df = df[df[key_col] != key]
+            if decision is not None:
+                df = pd.concat([df, pd.DataFrame({key_col: [key], decision_col: [decision]})])
+        df.to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("round_no", range(1, SEASON_ROUNDS))
+def test_correct_decisions_matches_replay(season, round_no):
+    conn = season.conn
+    corrections = _corrections(conn, round_no)
+    result = correct_decisions(conn, round_no, corrections)
+    assert result.changed, "the corrections should change a later round"
+    offers, status = read_offers(conn), _status_table(conn)
+
+    _apply_to_files(season.decision_dir, round_no, corrections)
+    replay_season(season.decision_dir, rounds=SEASON_ROUNDS, conn=conn)
+
+    pd.testing.assert_frame_equal(read_offers(conn), offers)
+    pd.testing.assert_frame_equal(_status_table(conn), status)
@@ -0,0 +1,77 @@
+from engine.status import STATUS_FIELDS, refresh_candidate_status, resolve_candidate_status
+
+
+def _reference_status(conn, coap):
+    """The detail dialog's original per-candidate rules, one query per step."""
+    data = dict(conn.execute("SELECT * FROM candidates WHERE COAP = ? LIMIT 1", (coap,)).fetchone())
+    data.update({field: "NULL" for field in STATUS_FIELDS})
+
+    offers = conn.execute(
+        "SELECT round_no, category, offer_status FROM offers WHERE COAP = ? ORDER BY round_no DESC", (coap,)
+    ).fetchall()
+    max_round = max((o["round_no"] for o in offers), default=0)
+    if offers:
+        # latest offer that is not a retained one, else the latest
+        offer = next((o for o in offers if "RETAINED" not in o["offer_status"].upper()), offers[0])
+        data["Offered"] = "Y"
+        data["OfferCat"] = offer["category"]
+        data["OfferedRound"] = offer["round_no"]
+        is_pwd = "_PWD" in offer["category"].upper() or "PWD" in offer["offer_status"].upper()
+        data["isOfferPwd"] = "Yes" if is_pwd else "No"
+
+        final_found = False
+        for row in conn.execute("""
+            SELECT round_no, decision FROM decisions
+            WHERE key = ? AND source = 'goa' AND round_no <= ?
+            ORDER BY round_no DESC
+        """, (data["App_no"], max_round)):
+            if not final_found and row["decision"] in ("Accept and Freeze", "Reject and Wait"):
+                data["Accepted"] = "Y" if row["decision"] == "Accept and Freeze" else "N"
+                data["RejectOrAcceptRound"] = row["round_no"]
+                final_found = True
+            if row["decision"] == "Retain and Wait" and data["RetainRound"] == "NULL":
+                data["RetainRound"] = row["round_no"]
+                if not final_found:
+                    data["Accepted"] = "R"
+
+        elsewhere = conn.execute("""
+            SELECT MIN(round_no) FROM decisions
+            WHERE key = ? AND source = 'consolidated' AND decision = 'Accept and Freeze' AND round_no <= ?
+        """, (coap, max_round)).fetchone()[0]
+        if elsewhere is not None:
+            data.update({field: "NULL" for field in STATUS_FIELDS})
+            data.update(Offered="N", Accepted="E", RejectOrAcceptRound=elsewhere)
+    return data
+
+
+def _add_accepted_elsewhere(conn):
+    """
+    Consolidated Accept and Freeze for offered candidates (rare in a synthetic
+    season): within the latest offered round, and one after it, which must not count.
+    """
+    offered = conn.execute("""
+        SELECT COAP, MAX(round_no) FROM offers GROUP BY COAP ORDER BY COAP LIMIT 3
+    """).fetchall()
+    conn.executemany(
+        "INSERT OR REPLACE INTO decisions (round_no, source, key, decision) VALUES (?, 'consolidated', ?, 'Accept and Freeze')",
+        [(offered[0][1], offered[0][0]), (1, offered[1][0]), (offered[2][1] + 1, offered[2][0])],
+    )
+    refresh_candidate_status(conn)
+    conn.commit()
+
+
+def test_resolved_status_matches_per_candidate_rules(season):
+    conn = season.conn
+    _add_accepted_elsewhere(conn)
+    coaps = [row[0] for row in conn.execute("SELECT COAP FROM candidates ORDER BY COAP")]
+    seen = set()
+    for coap in coaps:
+        resolved = resolve_candidate_status(conn, coap)
+        assert resolved == _reference_status(conn, coap), coap
+        seen.add(resolved["Accepted"])
+    # every status the dialog can show occurs in the season
+    assert seen == {"Y", "N", "R", "E", "NULL"}
+
+
+def test_unknown_candidate_has_no_status(season):
+    assert resolve_candidate_status(season.conn, "COAP-NONE") == {}
@@ -0,0 +1,41 @@
+# ui/import_worker.py
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from database import db_manager
+from database.bulk_import import stream_import_candidates
+
+
+class ImportWorkerSignals(QObject):
+    """Signals emitted by ImportWorker (QRunnable itself cannot emit)."""
+    progress = Signal(int, object)   # rows done, estimated total (None if unknown)
+    finished = Signal(object)        # rows sent to SQLite, None if no column maps
+    failed = Signal(str)
+
+
+class ImportWorker(QRunnable):
+    """
+    Runs the applicants import off the GUI thread: the file is streamed into
+    candidates in ONE transaction (see database.bulk_import), so the GUI never
+    runs its event loop while that transaction is open.
+    """
+    def __init__(self, file_path, rename_map, table_columns):
+        super().__init__()
+        self.file_path = file_path
+        self.rename_map = rename_map
+        self.table_columns = table_columns
+        self.signals = ImportWorkerSignals()
+        # the GUI keeps a reference until the completion slot has run
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            inserted = stream_import_candidates(
+                self.file_path, self.rename_map, self.table_columns,
+                progress=self.signals.progress.emit,
+            )
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            db_manager.close_thread_connections()
+        self.signals.finished.emit(inserted)
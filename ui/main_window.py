@@ -1,18 +1,22 @@
 # main_window.py
-import sqlite3
-from PySide6.QtCore import Qt,Signal
+from PySide6.QtCore import Qt,Signal,QThreadPool
 from PySide6.QtWidgets import (
-    QApplication, QMainWindow,QDialog, QWidget, QVBoxLayout, QMessageBox, 
+    QMainWindow,QDialog, QWidget, QVBoxLayout, QMessageBox, 
     QTabWidget, QPushButton, QFileDialog, QLabel, QComboBox, QTableWidget, 
-    QTableWidgetItem, QScrollArea, QGroupBox, QToolBox, QHBoxLayout,QToolButton,QSizePolicy
+    QTableWidgetItem, QScrollArea, QGroupBox, QToolBox, QHBoxLayout,QToolButton,QSizePolicy,
+    QProgressBar
 )
 import re, difflib, json
-import numpy as np
 from ui.update_dialog import UpdateDialog
-from ui.rounds_manager import run_round, download_offers, upload_round_decisions 
-import pandas as pd
+from ui.rounds_manager import download_offers
+from ui.round_worker import RoundWorker
+from ui.import_worker import ImportWorker
 import re
 from database import db_manager 
+from database.sheet_reader import FILE_FILTER, read_preview
+from engine.allocation import SEAT_CATEGORIES
+from engine.snapshot import invalidate_snapshots
+from engine.status import ensure_candidate_status, refresh_candidate_status
 from ui.round_upload_widget import RoundUploadWidget
 from ui.search_page import SearchPage
 from ui.seat_matrix_upload import SeatMatrixUpload
@@ -48,37 +52,19 @@ REQUIRED_MAPPING_TARGETS = [
 ]
 
 DB_NAME = "mtech_offers.db"
-def _coerce_df_for_sql(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Convert DataFrame values to SQLite-safe Python types:
-    - Timestamp -> YYYY-MM-DD string
-    - numpy scalars -> python native types
-    - NaN -> None
-    """
-    out = df.copy()
-    out = out.where(pd.notnull(out), None)
-
-    for col in out.columns:
-        if pd.api.types.is_datetime64_any_dtype(out[col]):
-            out[col] = out[col].apply(lambda x: x.strftime('%Y-%m-%d') if x else None)
-            continue
-
-        out[col] = out[col].apply(
-            lambda v: (
-                v.strftime('%Y-%m-%d') if hasattr(v, "to_pydatetime")
-                else (v.item() if isinstance(v, np.generic) else v)
-            )
-        )
-    return out
 
 class MainWindow(QMainWindow):
     def __init__(self):
         from database import db_manager
         db_manager.init_db()
+        conn = db_manager.get_connection()
+        ensure_candidate_status(conn)   # databases with offers from before candidate_status
+        conn.close()
         super().__init__()
         self.setWindowTitle("MTech Offers Automation")
         self.resize(900, 600)
         self.total_rounds = 11
+        self.import_worker = None
         
         # Create tab widget
         self.tabs = QTabWidget()
@@ -97,6 +83,7 @@ class MainWindow(QMainWindow):
         self.rounds_tab = RoundsWidget(total_rounds=self.total_rounds)
         self.tabs.addTab(self.rounds_tab, "Rounds")
         self.rounds_tab.roundsRefreshed.connect(self.seat_matrix_tab.load_matrix)
+        self.rounds_tab.runningChanged.connect(self._on_round_running)
         # Search tab
         self.search_tab = SearchPage(db_path="mtech_offers.db")
         self.search_tab.updateRequested.connect(self.open_update_page) 
@@ -210,23 +197,24 @@ class MainWindow(QMainWindow):
     def upload_excel(self):
         from ui.mapping_preview import MappingPreviewDialog
 
+        if self.import_worker is not None:
+            return
+
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Excel File", "", "Excel Files (*.xlsx *.xls)"
+            self, "Select Excel File", "", FILE_FILTER
         )
         if not file_path:
             return
 
         try:
-            df = pd.read_excel(file_path)
+            # Only a header/preview sample is loaded here; rows are streamed on import
+            df = read_preview(file_path)
             df = df.loc[:, df.columns.notnull()]
             df = df.loc[:, ~df.columns.duplicated()]
-            df = df.where(pd.notnull(df), None)
 
             # Read DB columns
             conn = db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(candidates)")
-            table_columns = [info[1] for info in cursor.fetchall()]
+            table_columns = db_manager.columns(conn, "candidates")
             conn.close()
 
             # Header normalization
@@ -303,43 +291,52 @@ class MainWindow(QMainWindow):
                 if src:
                     rename_map[src] = tgt
 
-            df = df.rename(columns=rename_map)
+            # Stream the rows in on a worker thread; the import holds one write transaction
+            self.import_worker = ImportWorker(file_path, rename_map, table_columns)
+            self.import_worker.signals.progress.connect(self._on_import_progress)
+            self.import_worker.signals.finished.connect(self._on_import_finished)
+            self.import_worker.signals.failed.connect(self._on_import_failed)
+            self._set_import_running(True)
+            self.status_label.setText("Importing applicants...")
+            QThreadPool.globalInstance().start(self.import_worker)
 
-            # prepare insert columns (same as you did)
-            insert_cols = [c for c in df.columns if c in table_columns]
-            if not insert_cols:
-                self.status_label.setText("No valid mapped columns!")
-                return
+        except Exception as e:
+            self.status_label.setText(f"Error: {e}")
 
-            # convert all values to sqlite-safe Python types
-            df_for_sql = _coerce_df_for_sql(df)
+    def _set_import_running(self, running):
+        """Lock everything that reads or writes candidates while an import runs."""
+        self.upload_btn.setEnabled(not running)
+        self.reset_db_btn.setEnabled(not running)
+        self.seat_matrix_tab.setEnabled(not running)
+        self.rounds_tab.setEnabled(not running)
+
+    def _on_round_running(self, running):
+        """Reset closes every pooled connection and Import writes candidates: neither may run under a round."""
+        self.upload_btn.setEnabled(not running)
+        if running:
+            self.reset_db_btn.setEnabled(False)
+        else:
+            self.update_init_tab_state()
 
-            # build SQL
-            placeholders = ', '.join(['?'] * len(insert_cols))
-            cols_sql = ', '.join([f'"{c}"' for c in insert_cols])   # quoted columns
+    def _on_import_progress(self, done, total):
+        suffix = f"/{total}" if total else ""
+        self.status_label.setText(f"Importing applicants... {done}{suffix}")
 
-            conn = db_manager.get_connection()
-            cur = conn.cursor()
-            try:
-                for _, row in df_for_sql.iterrows():
-                    vals = [row.get(c) for c in insert_cols]
-                    cur.execute(
-                        f'INSERT OR IGNORE INTO candidates ({cols_sql}) VALUES ({placeholders})',
-                        vals
-                    )
-                conn.commit()
-                self.status_label.setText("Excel uploaded & mapped successfully!")
-            except Exception as e:
-                conn.rollback()
-                self.status_label.setText(f"Error saving to DB: {e}")
-            finally:
-                conn.close()
+    def _finish_import(self):
+        self.import_worker = None
+        self._set_import_running(False)
+        self.update_init_tab_state()
 
-            self.update_init_tab_state()
-            self.status_label.setText("Excel uploaded & mapped successfully!")
+    def _on_import_finished(self, inserted):
+        self._finish_import()
+        if inserted is None:
+            self.status_label.setText("No valid mapped columns!")
+            return
+        self.status_label.setText("Excel uploaded & mapped successfully!")
 
-        except Exception as e:
-            self.status_label.setText(f"Error: {e}")
+    def _on_import_failed(self, message):
+        self._finish_import()
+        self.status_label.setText(f"Error saving to DB: {message}")
 
 class SeatMatrixTab(QWidget):
     def __init__(self):
@@ -369,14 +366,7 @@ class SeatMatrixTab(QWidget):
         self.accordion_layout.setSpacing(6)
         layout.addWidget(self.accordion)
         
-        self.categories = {
-            "COMMON_PWD": ["COMMON_PWD"],
-            "EWS": ["EWS_FandM", "EWS_FandM_PWD", "EWS_Female", "EWS_Female_PWD"],
-            "GEN": ["GEN_FandM", "GEN_FandM_PWD", "GEN_Female", "GEN_Female_PWD"],
-            "OBC": ["OBC_FandM", "OBC_FandM_PWD", "OBC_Female", "OBC_Female_PWD"],
-            "SC": ["SC_FandM", "SC_FandM_PWD", "SC_Female", "SC_Female_PWD"],
-            "ST": ["ST_FandM", "ST_FandM_PWD", "ST_Female", "ST_Female_PWD"],
-        }
+        self.categories = {section: list(keys) for section, keys in SEAT_CATEGORIES.items()}
 
         self.tables = {}
         self.create_sections()
@@ -600,8 +590,7 @@ class SeatMatrixTab(QWidget):
         cursor = conn.cursor()
         
         # Check if 'offers' table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='offers'")
-        if cursor.fetchone() is None:
+        if not db_manager.has_table(conn, "offers"):
             conn.close()
             return False
 
@@ -702,6 +691,7 @@ class SeatMatrixTab(QWidget):
             
 class RoundsWidget(QWidget):
     roundsRefreshed = Signal()
+    runningChanged = Signal(bool)   # a RoundWorker started / finished
     def __init__(self, total_rounds=11):
         super().__init__()
         self.total_rounds = total_rounds
@@ -736,6 +726,22 @@ class RoundsWidget(QWidget):
 
         self.layout.addLayout(btn_layout)
 
+        # ------------------ Background generation progress ------------------
+        progress_layout = QHBoxLayout()
+        self.progress_label = QLabel("")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_round)
+        progress_layout.addWidget(self.progress_label)
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.cancel_btn)
+        self.layout.addLayout(progress_layout)
+        self._set_progress_visible(False)
+
+        self.thread_pool = QThreadPool.globalInstance()
+        self.worker = None
+
         # ------------------ Signals ------------------
         self.round_combo.currentIndexChanged.connect(self.update_ui_visibility)
 
@@ -751,11 +757,10 @@ class RoundsWidget(QWidget):
 
     def refresh_rounds(self):
         self.round_combo.clear()
-        conn = sqlite3.connect(DB_NAME)
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='offers'")
-        if cursor.fetchone() is None:
+        if not db_manager.has_table(conn, "offers"):
             max_round = 0
         else:
             cursor.execute("SELECT MAX(round_no) FROM offers")
@@ -819,38 +824,86 @@ class RoundsWidget(QWidget):
             self.delete_round_btn.setVisible(False) # Hide the delete button
 
     def run_round(self):
+        if self.worker is not None:
+            return
         round_no = self.get_current_round()
+        decision_files = None
 
         if round_no > 1:
             # Check if all 3 files uploaded
-            file_paths = [
-                self.upload_widget.goa_widget.get_file_path(),
-                self.upload_widget.other_widget.get_file_path(),
-                self.upload_widget.cons_widget.get_file_path()
-            ]
+            widgets = (
+                self.upload_widget.goa_widget,
+                self.upload_widget.other_widget,
+                self.upload_widget.cons_widget
+            )
 
-            if not all(file_paths):
+            if not all(w.get_file_path() for w in widgets):
                 QMessageBox.critical(self, "Missing Files",
                                     f"Please upload all 3 decision files for Round {round_no - 1}.")
                 return
 
-            prev_round = round_no - 1
-
-            # Upload decision files
-            upload_round_decisions(
-                round_no=prev_round,
-                goa_widget=self.upload_widget.goa_widget,
-                other_widget=self.upload_widget.other_widget,
-                cons_widget=self.upload_widget.cons_widget
-            )
-
-        # Run allocation for current round
-        run_round(round_no)
+            # The worker reads and matches the files, then stores them for round_no - 1
+            decision_files = [w.get_mapping() for w in widgets]
+
+        # Run allocation for current round in the background
+        self.worker = RoundWorker(round_no, decision_files)
+        self.worker.signals.progress.connect(self._on_round_progress)
+        self.worker.signals.finished.connect(self._on_round_finished)
+        self.worker.signals.failed.connect(self._on_round_failed)
+        self.worker.signals.cancelled.connect(self._on_round_cancelled)
+
+        self.generate_btn.setEnabled(False)
+        self.round_combo.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText(f"Round {round_no}: starting...")
+        self._set_progress_visible(True)
+        self.runningChanged.emit(True)
+        self.thread_pool.start(self.worker)
+
+    def cancel_round(self):
+        if self.worker is not None:
+            self.cancel_btn.setEnabled(False)
+            self.progress_label.setText("Cancelling...")
+            self.worker.cancel()
+
+    def _set_progress_visible(self, visible):
+        self.progress_label.setVisible(visible)
+        self.progress_bar.setVisible(visible)
+        self.cancel_btn.setVisible(visible)
+        self.cancel_btn.setEnabled(visible)
+
+    def _on_round_progress(self, stage, percent):
+        self.progress_label.setText(stage)
+        self.progress_bar.setValue(percent)
+
+    def _finish_worker(self):
+        self.worker = None
+        self._set_progress_visible(False)
+        self.round_combo.setEnabled(True)
+        self.runningChanged.emit(False)
 
         # Update UI
         self.refresh_rounds()
         self.update_ui_visibility()
 
+    def _on_round_finished(self, result):
+        round_no = result.round_no
+        self._finish_worker()
+        if result.eligible_count == 0:
+            QMessageBox.warning(self, "Round Complete", f"No eligible candidates for Round {round_no}.")
+        else:
+            QMessageBox.information(self, "Success", f"Round {round_no} allocation complete!\nTotal offers: {len(result.offers)}")
+
+    def _on_round_failed(self, message):
+        round_no = self.worker.round_no
+        self._finish_worker()
+        QMessageBox.critical(self, "Error", f"Error during round {round_no} allocation:\n{message}")
+
+    def _on_round_cancelled(self):
+        round_no = self.worker.round_no
+        self._finish_worker()
+        QMessageBox.information(self, "Cancelled", f"Round {round_no} generation was cancelled. Nothing was saved.")
+
     def download_current_round_offers(self):
         round_no = self.get_current_round()
         download_offers(round_no)
@@ -887,18 +940,16 @@ class RoundsWidget(QWidget):
             return
 
         # 2. Delete offers from the main 'offers' table
-        conn = sqlite3.connect(DB_NAME)
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         try:
             # Delete the offers generated by run_round(round_no)
             cursor.execute("DELETE FROM offers WHERE round_no = ?", (round_no,))
             if round_no > 1:
-                iit_goa_table = f"iit_goa_offers_round{round_no-1}"
-                accepted_other_table = f"accepted_other_institute_round{round_no-1}"
-                consolidated_table = f"consolidated_decisions_round{round_no-1}"
-                cursor.execute(f"DELETE FROM {iit_goa_table}")
-                cursor.execute(f"DELETE FROM {accepted_other_table}")
-                cursor.execute(f"DELETE FROM {consolidated_table}")
+                # decision files uploaded for round_no - 1 when this round was generated
+                cursor.execute("DELETE FROM decisions WHERE round_no = ?", (round_no - 1,))
+            invalidate_snapshots(conn, max(round_no - 1, 1))
+            refresh_candidate_status(conn)
             conn.commit()
             QMessageBox.information(self, "Success", f"All generated offers for Round {round_no} have been deleted.")
 
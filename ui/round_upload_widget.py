@@ -1,13 +1,13 @@
 import os
 import sqlite3
-import pandas as pd
+from database.sheet_reader import FILE_FILTER, read_preview
+from engine.round_data import read_decision_file
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,QInputDialog,
     QFileDialog, QComboBox, QTableWidget, QTableWidgetItem, QMessageBox
 )
 
 DB_NAME = "mtech_offers.db"
-from ui.rounds_manager import upload_round_decisions
 def _sanitize_col_name(name: str) -> str:
     """Sanitize SQL column names (letters, numbers, underscore only)."""
     return "".join(c if c.isalnum() or c == "_" else "_" for c in str(name)).lower()
@@ -19,7 +19,7 @@ class SingleFileUpload(QWidget):
         self.required_map = required_map   # list of tuples: (db_col, human_label)
 
         self.file_path = None
-        self.df = None
+        self.preview_df = None   # header + first rows only; the full file is read on demand
         self.col_map = {}    # {"mtech_app_no": "Excel Col Name", ...}
 
         self.layout = QVBoxLayout()
@@ -44,7 +44,7 @@ class SingleFileUpload(QWidget):
     def reset_widget(self):
         """Reset file selection and column mapping."""
         self.file_path = None
-        self.df = None
+        self.preview_df = None
         self.col_map = {}
 
         self.title_label.setText(f"{self.title}: <font color='red'>No file uploaded</font>")
@@ -56,20 +56,20 @@ class SingleFileUpload(QWidget):
             self.table_widget = None
         
     def select_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "", "Excel Files (*.xlsx *.xls)")
+        path, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "", FILE_FILTER)
         if not path:
             return
 
         self.file_path = path
 
         try:
-            self.df = pd.read_excel(self.file_path)
+            self.preview_df = read_preview(self.file_path)
             self.title_label.setText(f"{self.title}: <font color='green'>{os.path.basename(path)}</font>")
             self.get_cols_btn.setEnabled(True)
         except Exception as e:
             QMessageBox.critical(self, "File Error", f"Could not read Excel file:\n{e}")
             self.file_path = None
-            self.df = None
+            self.preview_df = None
             self.get_cols_btn.setEnabled(False)
 
     def show_column_match_table(self):
@@ -88,17 +88,17 @@ class SingleFileUpload(QWidget):
             self.table_widget.setItem(i, 0, QTableWidgetItem(human_label))
 
             combo = QComboBox()
-            combo.addItems(self.df.columns.tolist())
+            combo.addItems(self.preview_df.columns.tolist())
 
             # --- AUTO-MATCH HERE ---
-            auto = self.best_match(db_col, self.df.columns.tolist())
+            auto = self.best_match(db_col, self.preview_df.columns.tolist())
             if auto:
                 combo.setCurrentText(auto)
                 self.set_col_map(db_col, auto)
             else:
                 # fallback: first column
-                combo.setCurrentText(self.df.columns[0])
-                self.set_col_map(db_col, self.df.columns[0])
+                combo.setCurrentText(self.preview_df.columns[0])
+                self.set_col_map(db_col, self.preview_df.columns[0])
 
             combo.currentTextChanged.connect(lambda val, db=db_col: self.set_col_map(db, val))
             self.table_widget.setCellWidget(i, 1, combo)
@@ -128,18 +128,13 @@ class SingleFileUpload(QWidget):
         return None
 
 
+    def get_mapping(self):
+        """(file path, {DB column: Excel column}) as selected; read with engine.round_data.read_decision_file()."""
+        return self.file_path, dict(self.col_map)
+
     def get_mapped_dataframe(self):
         """Return df with DB column names based on selected mapping."""
-        if self.df is None or len(self.col_map) == 0:
-            return None
-        df = self.df.copy()
-        rename_dict = {excel: db for db, excel in self.col_map.items()}  
-        df = df.rename(columns=rename_dict)
-
-        # Filter only required DB columns
-        df = df[list(self.col_map.keys())]
-
-        return df
+        return read_decision_file(*self.get_mapping())
 
 class RoundUploadWidget(QWidget):
     def __init__(self):
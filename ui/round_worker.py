@@ -0,0 +1,73 @@
+# ui/round_worker.py
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from database import db_manager
+from engine.allocation import AllocationCancelled
+from engine.round_data import execute_round, read_round_decisions, store_round_decisions
+from engine.status import refresh_candidate_status
+
+
+class RoundWorkerSignals(QObject):
+    """Signals emitted by RoundWorker (QRunnable itself cannot emit)."""
+    progress = Signal(str, int)      # stage, percent
+    finished = Signal(object)        # AllocationResult
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+class RoundWorker(QRunnable):
+    """
+    Runs "Generate Offers" off the GUI thread:
+    reads and stores the previous round's decision files (if given), allocates
+    the round and writes the offers in ONE transaction. Cancelling rolls
+    everything back.
+
+    decision_files: None for round 1, otherwise (path, col_map) of the goa,
+    other and consolidated files of round_no - 1 (see read_round_decisions).
+    """
+    def __init__(self, round_no, decision_files=None):
+        super().__init__()
+        self.round_no = round_no
+        self.decision_files = decision_files
+        self.signals = RoundWorkerSignals()
+        self._cancel_event = threading.Event()
+        # the GUI keeps a reference until the completion slot has run
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        conn = db_manager.get_connection()
+        try:
+            if self.decision_files is not None:
+                self.signals.progress.emit(f"Round {self.round_no}: reading decision files...", 0)
+                decisions = read_round_decisions(self.decision_files)
+                store_round_decisions(conn, self.round_no - 1, *decisions)
+
+            result = execute_round(
+                self.round_no, conn=conn,
+                progress=self.signals.progress.emit,
+                should_cancel=self.is_cancelled,
+            )
+            if result.eligible_count == 0:
+                # nothing allocated: keep the uploaded decisions, as the old flow did
+                if self.decision_files is not None:
+                    refresh_candidate_status(conn)
+                conn.commit()
+            self.signals.finished.emit(result)
+
+        except AllocationCancelled:
+            conn.rollback()
+            self.signals.cancelled.emit()
+        except Exception as e:
+            conn.rollback()
+            self.signals.failed.emit(str(e))
+        finally:
+            conn.close()
+            db_manager.close_thread_connections()
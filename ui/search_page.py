@@ -1,18 +1,144 @@
-import sqlite3
 from pathlib import Path
 from typing import Optional
 
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QBrush, QColor
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QEvent, QModelIndex, QThreadPool, QTimer
 from PySide6.QtWidgets import (
-    QWidget, QLabel, QLineEdit, QComboBox, QPushButton, QHBoxLayout, QVBoxLayout,
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QToolButton, QMessageBox
+    QWidget, QLabel, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout,
+    QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyleOptionButton, QStyle
 )
 
+from database.db_manager import SEARCH_COUNT_CAP
+from ui.search_worker import SearchWorker
+
+# (row key, header) of the result columns; the UPDATE action column comes last
+RESULT_COLUMNS = [
+    ("coap_id", "COAP ID"),
+    ("application_number", "Application Number"),
+    ("category", "Category"),
+    ("gender", "Gender"),
+    ("max_gate_score", "Max Gate Score"),
+    ("pwd", "PWD"),
+    ("ews", "EWS"),
+    ("offered_round", "Offered Round"),
+    ("accepted", "Decision"),        # Y / N / R / E, see engine/status.py
+]
+ACTION_COLUMN = len(RESULT_COLUMNS)
+ACTION_TEXT = "UPDATE"
+SEARCH_DEBOUNCE_MS = 250     # quiet time after the last keystroke before searching
+SEARCH_PAGE_SIZE = 100       # rows per fetch while scrolling
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """
+    Search results (row dicts from db_manager.search_candidates) plus the UPDATE
+    column, loaded a page at a time: when the view scrolls to the last loaded
+    row Qt calls fetchMore(), which asks for the next page through moreRequested.
+    """
+    moreRequested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._has_more = False      # more matches than the loaded rows may exist
+        self._loading = False       # a next page has been requested
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESULT_COLUMNS) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role != Qt.DisplayRole:
+            return None
+        if index.column() == ACTION_COLUMN:
+            return ACTION_TEXT
+        value = self._rows[index.row()].get(RESULT_COLUMNS[index.column()][0])
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or orientation != Qt.Horizontal:
+            return None
+        return RESULT_COLUMNS[section][1] if section < ACTION_COLUMN else "Action"
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._loading = True
+            self.moreRequested.emit()
+
+    def set_rows(self, rows, has_more=False):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._has_more = has_more
+        self._loading = False
+        self.endResetModel()
+
+    def append_rows(self, rows, has_more):
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        self._has_more = has_more
+        self._loading = False
+
+    def stop_paging(self):
+        """Keep the loaded rows but request no further pages (e.g. a new search started)."""
+        self._has_more = False
+        self._loading = False
+
+    def has_more(self):
+        return self._has_more
+
+    def last_key(self):
+        """Keyset of the last loaded row, for search_candidates(after=...)."""
+        last = self._rows[-1]
+        return (last["coap_id"], last["row_key"])
+
+    def record(self, row):
+        return dict(self._rows[row])
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Paints the cell as a push button and emits clicked(row) on release; no widget per row."""
+    clicked = Signal(int)
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = index.data()
+        button.state = QStyle.State_Enabled | (option.state & QStyle.State_MouseOver)
+        widget = option.widget
+        style = widget.style() if widget is not None else None
+        if style is not None:
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        hint.setWidth(option.fontMetrics.horizontalAdvance(ACTION_TEXT) + 32)
+        return hint
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.position().toPoint()):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
 class SearchPage(QWidget):
     """
-    Search by COAP ID (partial match supported).
-    Shows: COAP | App_no | Category | Gender | MaxGATEScore_3yrs | Pwd | Ews
+    Search by COAP ID, application number, email or name (partial match supported),
+    as you type: queries run on a worker thread once typing pauses, and a newer
+    query cancels the one still running. Results load a page at a time as the
+    table is scrolled, with the match count shown above it.
+    Shows: COAP | App_no | Category | Gender | MaxGATEScore_3yrs | Pwd | Ews | OfferedRound | Accepted
     Emits updateRequested(dict) when UPDATE is clicked.
     """
     updateRequested = Signal(dict)
@@ -22,42 +148,63 @@ class SearchPage(QWidget):
         self.setObjectName("SearchPage")
         self.db_path = Path(db_path) if db_path else Path.cwd() / "mtech_offers.db"
 
+        # ---- Search state ----
+        self._query_id = 0          # id of the latest search; older results are dropped
+        self._query_text = ""
+        self._total = None          # match count of the latest search (capped)
+        self._next_job = 0
+        self._jobs = {}             # job id -> (query id, SearchWorker) not yet finished
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(SEARCH_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._start_search)
+
         # ---- Filters ----
         self.coap_input = QLineEdit()
-        self.coap_input.setPlaceholderText("Enter COAP ID")
+        self.coap_input.setPlaceholderText("COAP ID, application number, email or name")
         self.coap_input.setClearButtonEnabled(True)
         self.coap_input.setMinimumWidth(300)
-        
-        # Removed self.category_combo and self.gender_combo
 
-        self.find_btn = QPushButton("SEARCH COAP")
+        self.find_btn = QPushButton("SEARCH")
         self.find_btn.setDefault(True)
         self.find_btn.clicked.connect(self._on_find_clicked)
 
         top = QHBoxLayout()
-        top.addWidget(QLabel("COAP ID:"))
+        top.addWidget(QLabel("Search:"))
         top.addWidget(self.coap_input, 2)
-        # Removed category/gender widgets
         top.addWidget(self.find_btn, 0, Qt.AlignLeft)
         top.addStretch(1)
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("color:#666;")
+        top.addWidget(self.count_label, 0, Qt.AlignRight)
 
         # ---- Results table ----
-        self.table = QTableWidget(0, 8, self)
-        self.table.setHorizontalHeaderLabels([
-            "COAP ID", "Application Number", "Category", "Gender",
-            "Max Gate Score", "PWD", "EWS", "Action"
-        ])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.horizontalHeader().setHighlightSections(False)
+        self.model = SearchResultsModel(self)
+        self.model.moreRequested.connect(self._on_more_requested)
+        self.action_delegate = ActionButtonDelegate(self)
+        self.action_delegate.clicked.connect(self._on_update_clicked)
+
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(ACTION_COLUMN, self.action_delegate)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        header.setSectionResizeMode(ACTION_COLUMN, QHeaderView.Fixed)
+        header.resizeSection(ACTION_COLUMN, self.fontMetrics().horizontalAdvance(ACTION_TEXT) + 40)
+        header.setHighlightSections(False)
         self.table.verticalHeader().setVisible(False)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         self.table.setShowGrid(True)
+        self.table.setMouseTracking(True)   # hover state for the painted buttons
 
         # Empty state
-        self.empty_label = QLabel("Enter a COAP ID and click Search.")
+        self.empty_label = QLabel("Start typing a COAP ID, application number, email or name.")
         self.empty_label.setAlignment(Qt.AlignCenter)
         self.empty_label.setStyleSheet("color:#666; font-size:14px; padding:16px;")
 
@@ -67,101 +214,110 @@ class SearchPage(QWidget):
         wrapper.addWidget(self.empty_label)
         self._set_empty(True)
 
+        self.coap_input.textChanged.connect(self._on_text_changed)
         self.coap_input.returnPressed.connect(self._on_find_clicked)
 
     # ---------- Helpers ----------
-    def _set_empty(self, is_empty: bool, message: Optional[str] = None):
+    def _set_empty(self, is_empty: bool, message: Optional[str] = None, error: bool = False):
         self.table.setVisible(not is_empty)
         self.empty_label.setVisible(is_empty)
         if message:
             self.empty_label.setText(message)
+        color = "red" if error else "#666"
+        self.empty_label.setStyleSheet(f"color:{color}; font-size:14px; padding:16px;")
 
-    def _connect(self) -> sqlite3.Connection:
-        if not self.db_path.exists():
-            # Show error box if DB is missing
-            QMessageBox.critical(self, "Database Error", f"Database not found: {self.db_path}")
-            raise FileNotFoundError(f"Database not found: {self.db_path}")
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _cancel_running(self):
+        for _, worker in self._jobs.values():
+            worker.cancel()
+
+    def _run_job(self, after=None, count=False):
+        """Start a SearchWorker for the current query: the first page (count=True) or the one after `after`."""
+        self._next_job += 1
+        worker = SearchWorker(self._next_job, str(self.db_path), self._query_text,
+                              limit=SEARCH_PAGE_SIZE, after=after, count=count)
+        worker.signals.finished.connect(self._on_results)
+        worker.signals.failed.connect(self._on_failed)
+        worker.signals.cancelled.connect(self._on_cancelled)
+        self._jobs[self._next_job] = (self._query_id, worker)
+        self._pool.start(worker)
+
+    def _update_count_label(self):
+        shown = self.model.rowCount()
+        if not shown:
+            self.count_label.setText("")
+        elif not self.model.has_more():
+            self.count_label.setText(f"{shown:,} match{'es' if shown != 1 else ''}")
+        elif self._total is not None and self._total >= SEARCH_COUNT_CAP:
+            self.count_label.setText(f"Showing {shown:,} of {SEARCH_COUNT_CAP:,}+ matches")
+        else:
+            self.count_label.setText(f"Showing {shown:,} of {max(self._total or 0, shown):,} matches")
 
     # ---------- Actions ----------
+    def _on_text_changed(self, _text):
+        self._debounce.start()      # restarts the quiet period
+
     def _on_find_clicked(self):
-        coap_id = self.coap_input.text().strip()
-        
-        if not coap_id:
-            self._set_empty(True, "Please enter a COAP ID to search.")
-            return
+        self._debounce.stop()
+        self._start_search()
 
-        try:
-            conn = self._connect()
-            # SQL query now uses LIKE for partial matching
-            cur = conn.execute("""
-                SELECT
-                    COAP AS coap_id,
-                    App_no AS application_number,
-                    Category AS category,
-                    Gender AS gender,
-                    MaxGATEScore_3yrs AS max_gate_score,
-                    Pwd AS pwd,
-                    Ews AS ews
-                FROM candidates
-                WHERE COAP LIKE ?
-                ORDER BY COAP
-                LIMIT 50;
-            """, (f"%{coap_id}%",)) # Wrap input in % for LIKE query
-            rows = list(cur)
-            conn.close()
-        except Exception as e:
-            self._show_error_row(f"DB error: {e}")
-            return
+    def _start_search(self):
+        text = self.coap_input.text().strip()
+        self._query_id += 1
+        self._query_text = text
+        self._total = None
+        self._cancel_running()
+        self.model.stop_paging()    # old rows stay visible until the new ones arrive
 
-        if not rows:
-            self._set_empty(True, f"No candidates found matching COAP ID: '{coap_id}'")
+        if not text:
+            self.model.set_rows([])
+            self._update_count_label()
+            self._set_empty(True, "Start typing a COAP ID, application number, email or name.")
+            return
+        if not self.db_path.exists():
+            self._set_empty(True, f"Database not found: {self.db_path}", error=True)
             return
 
-        self._populate_table(rows)
+        self._run_job(count=True)
 
-    def _show_error_row(self, message: str):
-        self.table.setRowCount(0)
-        self._set_empty(False)
-        self.table.setRowCount(1)
-        item = QTableWidgetItem(message)
-        item.setForeground(QBrush(QColor('red')))
-        self.table.setSpan(0, 0, 1, self.table.columnCount())
-        self.table.setItem(0, 0, item)
-
-    def _populate_table(self, rows: list[sqlite3.Row]):
-        self.table.clearSpans()
-        self.table.setRowCount(0)
+    def _on_more_requested(self):
+        self._run_job(after=self.model.last_key())
+
+    def _on_results(self, job_id: int, rows: list, total):
+        query_id, _ = self._jobs.pop(job_id, (None, None))
+        if query_id != self._query_id:
+            return      # superseded while it was running
+
+        first_page = total is not None      # first page of a new search
+        if first_page:
+            self._total = total
+        shown = len(rows) if first_page else self.model.rowCount() + len(rows)
+        # A short page is always the last one. Below the cap the count is exact,
+        # so a full page that reaches it is the last one too.
+        has_more = len(rows) == SEARCH_PAGE_SIZE
+        if has_more and self._total is not None and self._total < SEARCH_COUNT_CAP:
+            has_more = shown < self._total
+        if first_page:
+            self.model.set_rows(rows, has_more)
+            self.table.scrollToTop()
+        else:
+            self.model.append_rows(rows, has_more)
+        self._update_count_label()
+
+        if not self.model.rowCount():
+            self._set_empty(True, f"No candidates found matching: '{self._query_text}'")
+            return
         self._set_empty(False)
 
-        for row in rows:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-
-            def _set(c, v):
-                item = QTableWidgetItem("" if v is None else str(v))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(r, c, item)
-
-            _set(0, row["coap_id"])
-            _set(1, row["application_number"])
-            _set(2, row["category"])
-            _set(3, row["gender"])
-            _set(4, row["max_gate_score"])
-            _set(5, row["pwd"])
-            _set(6, row["ews"])
-
-            # UPDATE button
-            btn = QToolButton()
-            btn.setText("UPDATE")
-            btn.setCursor(Qt.PointingHandCursor)
-            # Pass the entire row dictionary when the button is clicked
-            btn.clicked.connect(lambda _, rr=dict(row): self.updateRequested.emit(rr))
-            self.table.setCellWidget(r, 7, btn)
-
-        self.table.resizeColumnsToContents()
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(7, QHeaderView.ResizeToContents)
\ No newline at end of file
+    def _on_failed(self, job_id: int, message: str):
+        query_id, _ = self._jobs.pop(job_id, (None, None))
+        if query_id != self._query_id:
+            return
+        self.model.set_rows([])
+        self._update_count_label()
+        self._set_empty(True, f"DB error: {message}", error=True)
+
+    def _on_cancelled(self, job_id: int):
+        self._jobs.pop(job_id, None)
+
+    def _on_update_clicked(self, row: int):
+        self.updateRequested.emit(self.model.record(row))
@@ -0,0 +1,78 @@
+# ui/search_worker.py
+import sqlite3
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from database import db_manager
+
+# SQLite VM steps between cancellation checks while a query runs
+CANCEL_CHECK_STEPS = 1000
+
+
+class SearchWorkerSignals(QObject):
+    """Signals emitted by SearchWorker (QRunnable itself cannot emit)."""
+    finished = Signal(int, object, object)   # job id, list of row dicts, match count (None if not counted)
+    failed = Signal(int, str)                # job id, message
+    cancelled = Signal(int)                  # job id
+
+
+class SearchWorker(QRunnable):
+    """
+    Runs one page of a candidate search off the GUI thread.
+
+    - after: keyset of the last row already loaded (see db_manager.search_candidates)
+    - count: also count the matches (first page only)
+
+    job_id lets the page drop results of searches it has superseded;
+    cancel() also aborts the SQL itself (through a progress handler), so a
+    stale search does not hold the worker thread while the user keeps typing.
+    Exactly one of finished / failed / cancelled is emitted.
+    """
+    def __init__(self, job_id, db_path, text, limit=50, after=None, count=False):
+        super().__init__()
+        self.job_id = job_id
+        self.db_path = db_path
+        self.text = text
+        self.limit = limit
+        self.after = after
+        self.count = count
+        self.signals = SearchWorkerSignals()
+        self._cancel_event = threading.Event()
+        # the page keeps a reference until one of the signals has been handled
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.job_id)
+            return
+        conn = db_manager.get_connection(self.db_path)
+        # a non-zero return value interrupts the running statement
+        conn.set_progress_handler(self.is_cancelled, CANCEL_CHECK_STEPS)
+        try:
+            rows = [dict(r) for r in db_manager.search_candidates(conn, self.text, self.limit, self.after)]
+            total = db_manager.count_search_matches(conn, self.text) if self.count else None
+        except sqlite3.OperationalError as e:
+            if self.is_cancelled():
+                self.signals.cancelled.emit(self.job_id)
+            else:
+                self.signals.failed.emit(self.job_id, str(e))
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.close()
+            db_manager.close_thread_connections()
+
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.job_id)
+        else:
+            self.signals.finished.emit(self.job_id, rows, total)
@@ -1,7 +1,7 @@
 # ui/seat_matrix_upload.py
-import pandas as pd
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QMessageBox
 from database import db_manager
+from database.sheet_reader import FILE_FILTER, iter_chunks, read_preview
 
 class SeatMatrixUpload(QWidget):
     def __init__(self):
@@ -17,29 +17,33 @@ class SeatMatrixUpload(QWidget):
 
     def upload_excel(self):
         path, _ = QFileDialog.getOpenFileName(
-            self, "Select Seat Matrix Excel", "", "Excel Files (*.xlsx *.xls)"
+            self, "Select Seat Matrix Excel", "", FILE_FILTER
         )
         if not path:
             return
 
         try:
-            df = pd.read_excel(path)
             expected = ["category", "set_seats", "seats_allocated", "seats_booked"]
-            if not all(col in df.columns for col in expected):
+            columns = read_preview(path, nrows=1).columns
+            if not all(col in columns for col in expected):
                 QMessageBox.warning(self, "Invalid Format", f"Excel must contain: {', '.join(expected)}")
                 return
-            
-            df.fillna(0, inplace=True)  
 
             conn = db_manager.get_connection()
             cursor = conn.cursor()
-            for _, row in df.iterrows():
-                cursor.execute("""
-                    INSERT OR REPLACE INTO seat_matrix (category, set_seats, seats_allocated, seats_booked)
-                    VALUES (?, ?, ?, ?)
-                """, (row["category"], int(row["set_seats"]), int(row["seats_allocated"]), int(row["seats_booked"])))
-            conn.commit()
-            conn.close()
+            try:
+                for df in iter_chunks(path, usecols=expected):
+                    df = df.fillna(0)
+                    cursor.executemany("""
+                        INSERT OR REPLACE INTO seat_matrix (category, set_seats, seats_allocated, seats_booked)
+                        VALUES (?, ?, ?, ?)
+                    """, [
+                        (cat, int(total), int(alloc), int(booked))
+                        for cat, total, alloc, booked in df[expected].itertuples(index=False, name=None)
+                    ])
+                conn.commit()
+            finally:
+                conn.close()
 
             self.status.setText("Seat matrix uploaded successfully!")
         except Exception as e:
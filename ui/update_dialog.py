@@ -8,6 +8,9 @@ from PySide6.QtWidgets import (
     QDialog, QWidget, QGridLayout, QVBoxLayout, QLabel, QPushButton, QScrollArea
 )
 
+from database import db_manager
+from engine.status import resolve_candidate_status
+
 # Map UI labels -> DB columns (None => calculated field)
 FIELD_MAP = {
     "FullName":              "Full_Name",
@@ -87,152 +90,12 @@ class UpdateDialog(QDialog):
     def _connect(self) -> sqlite3.Connection:
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+        return db_manager.get_connection(self.db_path)
     def _load_record(self) -> dict:
         """Fetch entire row for this COAP ID, plus the latest offer/decision status."""
         try:
             conn = self._connect()
-            cursor = conn.cursor()
-
-            # 1. Get candidate's core data
-            cursor.execute("""
-                SELECT * FROM candidates
-                WHERE COAP = ?
-                LIMIT 1
-            """, (self.coap_id,))
-            candidate_row = cursor.fetchone()
-            
-            if not candidate_row:
-                conn.close()
-                return {}
-            
-            data = dict(candidate_row)
-            app_no = data["App_no"] 
-            
-            # Initialize offer/decision fields to default NULL
-            data["Offered"] = "NULL"
-            data["Accepted"] = "NULL"
-            data["OfferCat"] = "NULL"
-            data["isOfferPwd"] = "NULL"
-            data["OfferedRound"] = "NULL"
-            data["RetainRound"] = "NULL"
-            data["RejectOrAcceptRound"] = "NULL"
-
-
-            # 2. Get the latest offer details (OfferedRound, OfferCat, isOfferPwd)
-            cursor.execute("""
-                SELECT round_no, category, offer_status
-                FROM offers
-                WHERE COAP = ?
-                ORDER BY round_no DESC
-            """, (self.coap_id,))
-            all_offers = cursor.fetchall()
-
-            max_round_with_offer = max(offer["round_no"] for offer in all_offers) if all_offers else 0
-            
-            if all_offers:
-                latest_offer_row = dict(all_offers[0])
-                
-                # Logic to find the ORIGINAL (non-retained) offer round
-                original_offer_round = latest_offer_row["round_no"] # Default to latest entry
-                
-                # Find the highest round that is NOT clearly a retained status
-                for offer in all_offers:
-                    offer_status = offer["offer_status"]
-                    if "RETAINED" not in offer_status.upper():
-                        original_offer_round = offer["round_no"]
-                        latest_offer_row = dict(offer)
-                        break # Found the original offer round
-                
-                data["Offered"] = "Y"
-                data["OfferCat"] = latest_offer_row["category"]
-                data["OfferedRound"] = original_offer_round
-                
-                # Determine isOfferPwd
-                offer_status = latest_offer_row["offer_status"]
-                is_pwd_offer = False
-                if "_PWD" in data["OfferCat"].upper() or "PWD" in offer_status.upper():
-                    is_pwd_offer = True
-                    
-                data["isOfferPwd"] = "Yes" if is_pwd_offer else "No"
-
-
-            # 3. Determine the latest decision made by the candidate (Y, N, R) and the Retain Round
-            
-            latest_decision_found = False
-            
-            if max_round_with_offer > 0:
-                # Loop backwards from the highest round to find the latest decision
-                for r in range(max_round_with_offer, 0, -1):
-                    decision_table = f"iit_goa_offers_round{r}"
-                    
-                    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{decision_table}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"""
-                            SELECT applicant_decision
-                            FROM {decision_table}
-                            WHERE mtech_app_no = ?
-                            LIMIT 1
-                        """, (app_no,))
-                        decision_row = cursor.fetchone()
-
-                        if decision_row:
-                            decision = decision_row["applicant_decision"]
-                            
-                            # A. Record the ABSOLUTE LATEST FINAL decision (Accept/Reject)
-                            if not latest_decision_found:
-                                if decision == 'Accept and Freeze':
-                                    data["Accepted"] = "Y"
-                                    data["RejectOrAcceptRound"] = r
-                                    latest_decision_found = True
-                                    
-                                elif decision == 'Reject and Wait':
-                                    data["Accepted"] = "N"
-                                    data["RejectOrAcceptRound"] = r
-                                    latest_decision_found = True
-                            
-                            # B. Record the LATEST RETAIN decision (regardless of later final decision)
-                            if decision == 'Retain and Wait' and data["RetainRound"] == "NULL":
-                                # This is the first (latest) retain decision we encounter in the backward loop
-                                data["RetainRound"] = r
-                                # If the latest decision (A) was not Y/N, then R is the current status
-                                if not latest_decision_found:
-                                    data["Accepted"] = "R"
-                                
-                                # If we found both the latest final decision AND the RetainRound, we can break.
-                                if latest_decision_found:
-                                    break
-            
-            # If we went through all rounds and found no decision, accepted remains "NULL".
-            # If a Retain was found but no final decision, Accepted is "R".
-            
-
-            # 4. Check for 'Accepted elsewhere' status (E) - This takes absolute precedence
-            if max_round_with_offer > 0:
-                for r in range(1, max_round_with_offer + 1): 
-                    consolidated_table = f"consolidated_decisions_round{r}"
-                    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{consolidated_table}'")
-                    if cursor.fetchone():
-                        # CORRECTED SYNTAX: using consolidated_table variable instead of f-string brace error
-                        cursor.execute(f"""
-                            SELECT coap_reg_id
-                            FROM {consolidated_table} 
-                            WHERE coap_reg_id = ? AND applicant_decision = 'Accept and Freeze'
-                            LIMIT 1
-                        """, (self.coap_id,))
-                        if cursor.fetchone():
-                            # Candidate accepted elsewhere (E)
-                            data["Accepted"] = "E"
-                            data["RejectOrAcceptRound"] = r 
-                            data["RetainRound"] = "NULL" 
-                            data["Offered"] = "N"
-                            data["OfferCat"] = "NULL"
-                            data["OfferedRound"] = "NULL"
-                            data["isOfferPwd"] = "NULL"
-                            break 
-            
+            data = resolve_candidate_status(conn, self.coap_id)
             conn.close()
             return data
         except Exception as e: